@@ -13,11 +13,13 @@ Each profile contains all parameters needed for:
 """
 
 from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Optional
 import os
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChallengePhase:
     """Single phase of a prop firm challenge."""
     name: str
@@ -26,9 +28,15 @@ class ChallengePhase:
     min_profit_per_day_pct: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AccountProfile:
-    """Complete account profile for prop firm trading."""
+    """
+    Complete account profile for prop firm trading.
+    
+    Profiles are immutable at runtime, so the derived USD limits and
+    buffered loss limits are computed once in __post_init__ and read
+    as plain attributes from the risk-check paths.
+    """
     name: str
     display_name: str
     starting_balance: float
@@ -56,35 +64,31 @@ class AccountProfile:
     platform: str = "MT5"
     hedge_mode: bool = True
     
-    def get_safe_daily_loss_limit(self) -> float:
-        """Daily loss limit with safety buffer."""
-        return self.max_daily_loss_pct - self.daily_loss_buffer_pct
-    
-    def get_safe_total_loss_limit(self) -> float:
-        """Total loss limit with safety buffer."""
-        return self.max_total_loss_pct - self.total_loss_buffer_pct
+    safe_daily_loss_limit: float = field(init=False, repr=False, compare=False)
+    safe_total_loss_limit: float = field(init=False, repr=False, compare=False)
+    max_risk_per_trade_usd: float = field(init=False, repr=False, compare=False)
+    max_open_risk_usd: float = field(init=False, repr=False, compare=False)
+    daily_loss_limit_usd: float = field(init=False, repr=False, compare=False)
+    total_loss_limit_usd: float = field(init=False, repr=False, compare=False)
+    _phases_by_num: tuple = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Precompute derived limits (daily/total limits with safety buffer, USD limits)."""
+        _set = object.__setattr__
+        _set(self, "safe_daily_loss_limit", self.max_daily_loss_pct - self.daily_loss_buffer_pct)
+        _set(self, "safe_total_loss_limit", self.max_total_loss_pct - self.total_loss_buffer_pct)
+        _set(self, "max_risk_per_trade_usd", self.starting_balance * self.risk_per_trade_pct)
+        _set(self, "max_open_risk_usd", self.starting_balance * self.max_open_risk_pct)
+        _set(self, "daily_loss_limit_usd", self.starting_balance * self.max_daily_loss_pct)
+        _set(self, "total_loss_limit_usd", self.starting_balance * self.max_total_loss_pct)
+        _set(self, "_phases_by_num", (None, *self.phases))
     
     def get_phase(self, phase_num: int) -> Optional[ChallengePhase]:
         """Get phase by number (1-indexed)."""
-        if 0 < phase_num <= len(self.phases):
-            return self.phases[phase_num - 1]
-        return None
-    
-    def get_max_risk_per_trade_usd(self) -> float:
-        """Maximum risk in USD per trade."""
-        return self.starting_balance * self.risk_per_trade_pct
-    
-    def get_max_open_risk_usd(self) -> float:
-        """Maximum total open risk in USD."""
-        return self.starting_balance * self.max_open_risk_pct
-    
-    def get_daily_loss_limit_usd(self) -> float:
-        """Daily loss limit in USD."""
-        return self.starting_balance * self.max_daily_loss_pct
-    
-    def get_total_loss_limit_usd(self) -> float:
-        """Total loss limit in USD (max drawdown)."""
-        return self.starting_balance * self.max_total_loss_pct
+        try:
+            return self._phases_by_num[phase_num] if phase_num > 0 else None
+        except IndexError:
+            return None
 
 
 THE5ERS_10K_HIGH_STAKES = AccountProfile(
@@ -173,12 +177,13 @@ THE5ERS_100K_HIGH_STAKES = AccountProfile(
 )
 
 
-AVAILABLE_PROFILES = {
+AVAILABLE_PROFILES = MappingProxyType({
     "the5ers_10k_high_stakes": THE5ERS_10K_HIGH_STAKES,
     "the5ers_100k_high_stakes": THE5ERS_100K_HIGH_STAKES,
-}
+})
 
 
+@lru_cache(maxsize=1)
 def get_active_profile() -> AccountProfile:
     """
     Get the currently active account profile.
@@ -186,6 +191,9 @@ def get_active_profile() -> AccountProfile:
     Set ACCOUNT_PROFILE env var to switch profiles:
     - "the5ers_10k_high_stakes" (default)
     - "the5ers_100k_high_stakes"
+    
+    The env var is read once per process; call
+    get_active_profile.cache_clear() to pick up a change.
     """
     profile_name = os.getenv("ACCOUNT_PROFILE", "the5ers_10k_high_stakes")
     return AVAILABLE_PROFILES.get(profile_name, THE5ERS_10K_HIGH_STAKES)
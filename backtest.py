@@ -27,7 +27,18 @@ Features:
 
 from __future__ import annotations
 
+import os
+import pickle
+import re
+import sys
+from array import array
+from collections import Counter
+from itertools import accumulate
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime, date, timedelta, timezone
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional
 
 from data import get_ohlcv
@@ -38,9 +49,17 @@ from strategy_core import (
     _compute_confluence_flags,
     _find_pivots,
     _atr,
+    _atr_series,
+    _pivot_series,
+    confluence_mask,
+    FLAG_RR,
+    QUALITY_MASK,
 )
 
 
+_YMD_RE = re.compile(r"^(\d{4})([-/])(\d{2})\2(\d{2})$")
+
+
 def _parse_partial_date(s: str, for_start: bool) -> Optional[date]:
     """Parse date strings like 'Jan 2024', '2024-01-01', 'Now'."""
     s = s.strip()
@@ -51,6 +70,19 @@ def _parse_partial_date(s: str, for_start: bool) -> Optional[date]:
     if lower in ("now", "today"):
         return date.today()
 
+    return _parse_fixed_date(s, for_start)
+
+
+@lru_cache(maxsize=256)
+def _parse_fixed_date(s: str, for_start: bool) -> Optional[date]:
+    """Parse a non-relative date string; cached since periods repeat across runs."""
+    m = _YMD_RE.match(s)
+    if m:
+        try:
+            return date(int(m[1]), int(m[3]), int(m[4]))
+        except ValueError:
+            pass
+
     fmts = ["%d %b %Y", "%d %B %Y", "%Y-%m-%d", "%Y/%m/%d"]
     for fmt in fmts:
         try:
@@ -93,6 +125,14 @@ def _parse_period(period_str: str) -> Tuple[Optional[date], Optional[date]]:
     return start, end
 
 
+_UTC = timezone.utc
+_ZERO_OFFSET = timedelta(0)
+
+_ISO_RE = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:\.(\d+))?Z?$"
+)
+
+
 def _candle_to_datetime(candle: Dict) -> Optional[datetime]:
     """Get datetime from a candle dict, normalized to UTC."""
     t = candle.get("time") or candle.get("timestamp") or candle.get("date")
@@ -103,14 +143,26 @@ def _candle_to_datetime(candle: Dict) -> Optional[datetime]:
     if isinstance(t, datetime):
         dt = t
     elif isinstance(t, date):
-        dt = datetime(t.year, t.month, t.day, tzinfo=timezone.utc)
+        dt = datetime(t.year, t.month, t.day, tzinfo=_UTC)
     elif isinstance(t, (int, float)):
         try:
-            dt = datetime.utcfromtimestamp(t).replace(tzinfo=timezone.utc)
+            dt = datetime.fromtimestamp(t, _UTC)
         except Exception:
             return None
     elif isinstance(t, str):
         s = t.strip()
+        m = _ISO_RE.match(s)
+        if m:
+            year, month, day, hour, minute, second, frac = m.groups()
+            try:
+                return datetime(
+                    int(year), int(month), int(day),
+                    int(hour), int(minute), int(second),
+                    int(frac[:6].ljust(6, "0")) if frac else 0,
+                    tzinfo=_UTC,
+                )
+            except ValueError:
+                pass
         try:
             s2 = s.replace("Z", "+00:00")
             if "." in s2:
@@ -133,9 +185,9 @@ def _candle_to_datetime(candle: Dict) -> Optional[datetime]:
     
     if dt is not None:
         if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        else:
-            dt = dt.astimezone(timezone.utc)
+            dt = dt.replace(tzinfo=_UTC)
+        elif dt.tzinfo is not _UTC and dt.utcoffset() != _ZERO_OFFSET:
+            dt = dt.astimezone(_UTC)
     
     return dt
 
@@ -145,20 +197,204 @@ def _candle_to_date(candle: Dict) -> Optional[date]:
     return dt.date() if dt else None
 
 
-def _build_date_list(candles: List[Dict]) -> List[Optional[date]]:
-    return [_candle_to_date(c) for c in candles]
-
-
 def _build_dt_list(candles: List[Dict]) -> List[Optional[datetime]]:
     """Build list of datetime objects for timestamp-accurate slicing."""
     return [_candle_to_datetime(c) for c in candles]
 
 
-def _slice_up_to_dt(candles: List[Dict], dts: List[Optional[datetime]], cutoff_dt: Optional[datetime]) -> List[Dict]:
-    """Slice candles up to and including cutoff datetime (timestamp-accurate)."""
-    if cutoff_dt is None:
-        return []
-    return [c for c, t in zip(candles, dts) if t and t <= cutoff_dt]
+def _candle_to_timestamp(candle: Dict, dt: Optional[datetime] = None) -> Optional[float]:
+    """
+    Epoch seconds for a candle.
+    
+    Numeric times are used as-is. Other formats use dt, the candle's
+    already-parsed datetime, when the caller has it, and are parsed otherwise.
+    """
+    t = candle.get("time") or candle.get("timestamp") or candle.get("date")
+    if isinstance(t, (int, float)):
+        return float(t)
+    if dt is None:
+        dt = _candle_to_datetime(candle)
+    return dt.timestamp() if dt is not None else None
+
+
+def _timed_series(
+    candles: List[Dict],
+    with_dates: bool = False,
+) -> Tuple[List[Dict], array, Optional[List[date]]]:
+    """
+    Drop candles without a usable time and return (candles, timestamps, dates).
+    
+    Timestamps are epoch seconds in a compact array('d'). Dates are only
+    built (from full datetimes) when with_dates is set; otherwise None.
+    Parsed times are kept in these parallel lists; the caller's candle
+    dicts are never modified, since they may be shared (e.g. cached data).
+    
+    The timestamps are sorted (candles arrive oldest -> newest), so the
+    slice end for every cutoff can be precomputed with _prefix_lengths.
+    """
+    if not with_dates:
+        kept = [(c, ts) for c in candles if (ts := _candle_to_timestamp(c)) is not None]
+        return [k[0] for k in kept], array("d", [k[1] for k in kept]), None
+    
+    dts = _build_dt_list(candles)
+    kept = [
+        (c, ts, dt.date())
+        for c, dt in zip(candles, dts)
+        if dt is not None and (ts := _candle_to_timestamp(c, dt)) is not None
+    ]
+    return [k[0] for k in kept], array("d", [k[1] for k in kept]), [k[2] for k in kept]
+
+
+def _prefix_lengths(ts: array, cutoffs: array) -> List[int]:
+    """
+    For each cutoff, the number of ts entries <= cutoff (bisect_right).
+    
+    Both lists are sorted, so this is one merge walk instead of a bisect per bar.
+    """
+    out: List[int] = []
+    j = 0
+    n = len(ts)
+    for cutoff in cutoffs:
+        while j < n and ts[j] <= cutoff:
+            j += 1
+        out.append(j)
+    return out
+
+
+def _cached_trend(cache: Dict[str, Tuple[int, str]], key: str, candles: List[Dict]) -> str:
+    """
+    Return _infer_trend(candles), recomputing only when the slice has grown.
+    
+    Slices are always prefixes of the same series, so an unchanged length
+    means an unchanged slice (weekly/monthly only grow when a new candle closes).
+    """
+    n = len(candles)
+    cached_n, trend = cache[key]
+    if n != cached_n:
+        trend = _infer_trend(candles) if candles else "mixed"
+        cache[key] = (n, trend)
+    return trend
+
+
+def _build_price_columns(candles: List[Dict]) -> Tuple[List[float], List[float], List[float]]:
+    """Split candles into parallel (high, low, close) columns, built once per run."""
+    return (
+        [c["high"] for c in candles],
+        [c["low"] for c in candles],
+        [c["close"] for c in candles],
+    )
+
+
+@dataclass(slots=True)
+class TradeExit:
+    """A closed backtest trade. asset is filled in by multi-asset callers."""
+    entry_date: str
+    exit_date: str
+    entry: float
+    sl: float
+    tp1: float
+    tp2: Optional[float]
+    tp3: Optional[float]
+    direction: str
+    rr: float
+    exit_reason: str
+    asset: str = ""
+
+
+EXIT_NONE = 0
+EXIT_SL = 1
+EXIT_TRAIL = 2
+EXIT_TP2 = 3
+EXIT_TP3 = 4
+
+_EXIT_REASONS = (None, "SL", "TP1+Trail", "TP2", "TP3")
+
+
+def _exit_scalar(
+    is_long: bool,
+    entry: float,
+    sl: float,
+    tp1: Optional[float],
+    tp2: Optional[float],
+    tp3: Optional[float],
+    risk: float,
+    tp1_hit: bool,
+    high: float,
+    low: float,
+) -> Tuple[int, float, bool, float]:
+    """
+    Scalar exit check for one bar.
+    
+    Returns (exit_code, rr, tp1_hit, sl) where exit_code is one of the EXIT_*
+    constants and (tp1_hit, sl) is the possibly-updated trailing state.
+    """
+    if is_long:
+        if low <= sl:
+            if tp1_hit:
+                return EXIT_TRAIL, max((sl - entry) / risk, 0.0), tp1_hit, sl
+            return EXIT_SL, -1.0, tp1_hit, sl
+        
+        if tp1_hit:
+            if tp3 is not None and high >= tp3:
+                return EXIT_TP3, (tp3 - entry) / risk, tp1_hit, sl
+            if tp2 is not None and high >= tp2:
+                return EXIT_TP2, (tp2 - entry) / risk, tp1_hit, sl
+        elif tp1 is not None and high >= tp1:
+            if low <= entry:
+                return EXIT_TRAIL, 0.0, True, entry
+            return EXIT_NONE, 0.0, True, entry
+    else:
+        if high >= sl:
+            if tp1_hit:
+                return EXIT_TRAIL, max((entry - sl) / risk, 0.0), tp1_hit, sl
+            return EXIT_SL, -1.0, tp1_hit, sl
+        
+        if tp1_hit:
+            if tp3 is not None and low <= tp3:
+                return EXIT_TP3, (entry - tp3) / risk, tp1_hit, sl
+            if tp2 is not None and low <= tp2:
+                return EXIT_TP2, (entry - tp2) / risk, tp1_hit, sl
+        elif tp1 is not None and low <= tp1:
+            if high >= entry:
+                return EXIT_TRAIL, 0.0, True, entry
+            return EXIT_NONE, 0.0, True, entry
+    
+    return EXIT_NONE, 0.0, tp1_hit, sl
+
+
+def _pivot_tail(
+    pivots: Tuple[List[int], List[float], List[int], List[float]],
+    n: int,
+    lookback: int = 3,
+) -> Tuple[List[float], List[float]]:
+    """
+    Last three swing highs/lows of candles[:n] from a full-series _pivot_series.
+    
+    That tail is all _find_last_swing_leg_for_fib reads.
+    """
+    high_idx, highs, low_idx, lows = pivots
+    kh = bisect_left(high_idx, n - lookback)
+    kl = bisect_left(low_idx, n - lookback)
+    return highs[max(0, kh - 3):kh], lows[max(0, kl - 3):kl]
+
+
+def _make_exit(trade: Dict, exit_date: date, rr: float, reason: str) -> TradeExit:
+    """Build the closed-trade record; entry_date's isoformat is cached at open."""
+    entry_date_str = trade.get("_entry_date_str")
+    if entry_date_str is None:
+        entry_date_str = trade["_entry_date_str"] = trade["entry_date"].isoformat()
+    return TradeExit(
+        entry_date_str,
+        exit_date.isoformat(),
+        trade["entry"],
+        trade["sl"],
+        trade["tp1"],
+        trade["tp2"],
+        trade["tp3"],
+        trade["direction"],
+        rr,
+        reason,
+    )
 
 
 def _maybe_exit_trade(
@@ -166,193 +402,106 @@ def _maybe_exit_trade(
     high: float,
     low: float,
     exit_date: date,
-) -> Optional[Dict]:
+) -> Optional[TradeExit]:
     """
     Check if trade hits TP or SL on a candle.
     Conservative approach: if SL and any TP are both hit on same bar, assume SL hit first.
     Trailing stop moves to breakeven after TP1 hit.
+    
+    The arithmetic lives in _exit_scalar; the result dict is only built
+    (by _make_exit) when the trade actually exits.
     """
-    direction = trade["direction"]
-    entry = trade["entry"]
-    sl = trade.get("trailing_sl", trade["sl"])
-    orig_sl = trade["sl"]
-    tp1 = trade["tp1"]
-    tp2 = trade["tp2"]
-    tp3 = trade["tp3"]
-    risk = trade["risk"]
     tp1_hit = trade.get("tp1_hit", False)
+    code, rr, new_tp1_hit, new_sl = _exit_scalar(
+        trade["is_long"],
+        trade["entry"],
+        trade.get("trailing_sl", trade["sl"]),
+        trade["tp1"],
+        trade["tp2"],
+        trade["tp3"],
+        trade["risk"],
+        tp1_hit,
+        high,
+        low,
+    )
+    
+    if new_tp1_hit and not tp1_hit:
+        trade["tp1_hit"] = True
+        trade["trailing_sl"] = new_sl
+    
+    if code == EXIT_NONE:
+        return None
+    
+    return _make_exit(trade, exit_date, rr, _EXIT_REASONS[code])
 
-    if direction == "bullish":
-        hit_tp3 = tp3 is not None and high >= tp3
-        hit_tp2 = tp2 is not None and high >= tp2
-        hit_tp1 = tp1 is not None and high >= tp1
-        hit_sl = low <= sl
 
-        if hit_sl:
-            if tp1_hit:
-                rr = (sl - entry) / risk
-                return {
-                    "entry_date": trade["entry_date"].isoformat(),
-                    "exit_date": exit_date.isoformat(),
-                    "entry": entry,
-                    "sl": orig_sl,
-                    "tp1": tp1,
-                    "tp2": tp2,
-                    "tp3": tp3,
-                    "direction": direction,
-                    "rr": max(rr, 0.0),
-                    "exit_reason": "TP1+Trail",
-                }
-            else:
-                return {
-                    "entry_date": trade["entry_date"].isoformat(),
-                    "exit_date": exit_date.isoformat(),
-                    "entry": entry,
-                    "sl": orig_sl,
-                    "tp1": tp1,
-                    "tp2": tp2,
-                    "tp3": tp3,
-                    "direction": direction,
-                    "rr": -1.0,
-                    "exit_reason": "SL",
-                }
+def _challenge_phase_scalar(
+    trade_days: List[int],
+    rrs: List[float],
+    account_size: float,
+    risk_per_trade_usd: float,
+    target_balance: float,
+    daily_loss_limit_usd: float,
+    total_loss_limit_usd: float,
+    min_day_profit_usd: float,
+) -> Tuple[float, int, int, bool, int, int, int]:
+    """
+    Single-pass challenge rule check over (day ordinal, rr) columns.
+    
+    Daily P&L lives in a flat list indexed by day offset instead of a dict
+    keyed by date string.
+    
+    Returns (balance, daily_loss_violations, total_loss_violations, passed,
+    days_to_complete, trading_days, profitable_days).
+    """
+    day_min = min(trade_days)
+    span = max(trade_days) - day_min + 1
+    daily_pnl = [0.0] * span
+    seen = bytearray(span)
+    
+    balance = account_size
+    trading_days = 0
+    daily_loss_violations = 0
+    total_loss_violations = 0
+    passed = False
+    days_to_complete = 0
+    
+    for day, rr in zip(trade_days, rrs):
+        k = day - day_min
+        if not seen[k]:
+            seen[k] = 1
+            trading_days += 1
         
-        if tp1_hit:
-            if hit_tp3:
-                rr = (tp3 - entry) / risk
-                return {
-                    "entry_date": trade["entry_date"].isoformat(),
-                    "exit_date": exit_date.isoformat(),
-                    "entry": entry,
-                    "sl": orig_sl,
-                    "tp1": tp1,
-                    "tp2": tp2,
-                    "tp3": tp3,
-                    "direction": direction,
-                    "rr": rr,
-                    "exit_reason": "TP3",
-                }
-            elif hit_tp2:
-                rr = (tp2 - entry) / risk
-                return {
-                    "entry_date": trade["entry_date"].isoformat(),
-                    "exit_date": exit_date.isoformat(),
-                    "entry": entry,
-                    "sl": orig_sl,
-                    "tp1": tp1,
-                    "tp2": tp2,
-                    "tp3": tp3,
-                    "direction": direction,
-                    "rr": rr,
-                    "exit_reason": "TP2",
-                }
-        elif hit_tp1 and not tp1_hit:
-            trade["tp1_hit"] = True
-            new_sl = entry
-            trade["trailing_sl"] = new_sl
-            if low <= new_sl:
-                return {
-                    "entry_date": trade["entry_date"].isoformat(),
-                    "exit_date": exit_date.isoformat(),
-                    "entry": entry,
-                    "sl": orig_sl,
-                    "tp1": tp1,
-                    "tp2": tp2,
-                    "tp3": tp3,
-                    "direction": direction,
-                    "rr": 0.0,
-                    "exit_reason": "TP1+Trail",
-                }
-            return None
-
-    else:
-        hit_tp3 = tp3 is not None and low <= tp3
-        hit_tp2 = tp2 is not None and low <= tp2
-        hit_tp1 = tp1 is not None and low <= tp1
-        hit_sl = high >= sl
-
-        if hit_sl:
-            if tp1_hit:
-                rr = (entry - sl) / risk
-                return {
-                    "entry_date": trade["entry_date"].isoformat(),
-                    "exit_date": exit_date.isoformat(),
-                    "entry": entry,
-                    "sl": orig_sl,
-                    "tp1": tp1,
-                    "tp2": tp2,
-                    "tp3": tp3,
-                    "direction": direction,
-                    "rr": max(rr, 0.0),
-                    "exit_reason": "TP1+Trail",
-                }
-            else:
-                return {
-                    "entry_date": trade["entry_date"].isoformat(),
-                    "exit_date": exit_date.isoformat(),
-                    "entry": entry,
-                    "sl": orig_sl,
-                    "tp1": tp1,
-                    "tp2": tp2,
-                    "tp3": tp3,
-                    "direction": direction,
-                    "rr": -1.0,
-                    "exit_reason": "SL",
-                }
+        pnl_usd = rr * risk_per_trade_usd
+        daily_pnl[k] += pnl_usd
+        balance += pnl_usd
         
-        if tp1_hit:
-            if hit_tp3:
-                rr = (entry - tp3) / risk
-                return {
-                    "entry_date": trade["entry_date"].isoformat(),
-                    "exit_date": exit_date.isoformat(),
-                    "entry": entry,
-                    "sl": orig_sl,
-                    "tp1": tp1,
-                    "tp2": tp2,
-                    "tp3": tp3,
-                    "direction": direction,
-                    "rr": rr,
-                    "exit_reason": "TP3",
-                }
-            elif hit_tp2:
-                rr = (entry - tp2) / risk
-                return {
-                    "entry_date": trade["entry_date"].isoformat(),
-                    "exit_date": exit_date.isoformat(),
-                    "entry": entry,
-                    "sl": orig_sl,
-                    "tp1": tp1,
-                    "tp2": tp2,
-                    "tp3": tp3,
-                    "direction": direction,
-                    "rr": rr,
-                    "exit_reason": "TP2",
-                }
-        elif hit_tp1 and not tp1_hit:
-            trade["tp1_hit"] = True
-            new_sl = entry
-            trade["trailing_sl"] = new_sl
-            if high >= new_sl:
-                return {
-                    "entry_date": trade["entry_date"].isoformat(),
-                    "exit_date": exit_date.isoformat(),
-                    "entry": entry,
-                    "sl": orig_sl,
-                    "tp1": tp1,
-                    "tp2": tp2,
-                    "tp3": tp3,
-                    "direction": direction,
-                    "rr": 0.0,
-                    "exit_reason": "TP1+Trail",
-                }
-            return None
-
-    return None
+        day_loss = daily_pnl[k]
+        if day_loss < 0 and abs(day_loss) > daily_loss_limit_usd:
+            daily_loss_violations += 1
+        
+        if account_size - balance > total_loss_limit_usd:
+            total_loss_violations += 1
+        
+        if balance >= target_balance and not passed:
+            passed = True
+            days_to_complete = trading_days
+    
+    profitable_days = sum(1 for k in range(span) if seen[k] and daily_pnl[k] >= min_day_profit_usd)
+    
+    return (
+        balance,
+        daily_loss_violations,
+        total_loss_violations,
+        passed,
+        days_to_complete,
+        trading_days,
+        profitable_days,
+    )
 
 
 def simulate_challenge_phase(
-    trades: List[Dict],
+    trades: List[TradeExit],
     account_size: float,
     risk_per_trade_pct: float,
     phase_target_pct: float,
@@ -382,45 +531,27 @@ def simulate_challenge_phase(
             "final_pnl_pct": 0.0,
         }
     
-    balance = account_size
-    peak_balance = account_size
-    risk_per_trade_usd = account_size * risk_per_trade_pct
-    target_balance = account_size * (1 + phase_target_pct)
-    min_day_profit_usd = account_size * min_profit_per_day_pct
+    trade_days = [date.fromisoformat(t.exit_date[:10]).toordinal() for t in trades]
+    rrs = [t.rr for t in trades]
     
-    daily_pnl: Dict[str, float] = {}
-    daily_loss_violations = 0
-    total_loss_violations = 0
-    passed = False
-    days_to_complete = 0
-    
-    for trade in trades:
-        trade_date = trade.get("exit_date", trade.get("entry_date", ""))
-        rr = trade.get("rr", 0)
-        pnl_usd = rr * risk_per_trade_usd
-        
-        if trade_date not in daily_pnl:
-            daily_pnl[trade_date] = 0.0
-        daily_pnl[trade_date] += pnl_usd
-        
-        balance += pnl_usd
-        
-        if balance > peak_balance:
-            peak_balance = balance
-        
-        day_loss = daily_pnl[trade_date]
-        if day_loss < 0 and abs(day_loss) > account_size * max_daily_loss_pct:
-            daily_loss_violations += 1
-        
-        total_dd = account_size - balance
-        if total_dd > account_size * max_total_loss_pct:
-            total_loss_violations += 1
-        
-        if balance >= target_balance and not passed:
-            passed = True
-            days_to_complete = len(daily_pnl)
-    
-    profitable_days = sum(1 for pnl in daily_pnl.values() if pnl >= min_day_profit_usd)
+    (
+        balance,
+        daily_loss_violations,
+        total_loss_violations,
+        passed,
+        days_to_complete,
+        trading_days,
+        profitable_days,
+    ) = _challenge_phase_scalar(
+        trade_days,
+        rrs,
+        account_size,
+        account_size * risk_per_trade_pct,
+        account_size * (1 + phase_target_pct),
+        account_size * max_daily_loss_pct,
+        account_size * max_total_loss_pct,
+        account_size * min_profit_per_day_pct,
+    )
     
     if passed and profitable_days < min_profitable_days:
         passed = False
@@ -445,7 +576,7 @@ def simulate_challenge_phase(
     return {
         "passed": passed,
         "reason": reason,
-        "days_to_complete": days_to_complete if passed else len(daily_pnl),
+        "days_to_complete": days_to_complete if passed else trading_days,
         "profitable_days": profitable_days,
         "min_profitable_days": min_profitable_days,
         "daily_loss_violations": daily_loss_violations,
@@ -453,11 +584,36 @@ def simulate_challenge_phase(
         "final_balance": balance,
         "final_pnl_pct": final_pnl_pct,
         "target_pnl_pct": phase_target_pct * 100,
-        "trading_days": len(daily_pnl),
+        "trading_days": trading_days,
     }
 
 
-def run_backtest(asset: str, period: str) -> Dict:
+# run_backtest's notes when the asset had no Daily candles (e.g. a failed fetch)
+NO_DAILY_DATA_NOTE = "No Daily data available."
+
+
+def _fetch_ohlcv_bundle(asset: str) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
+    """
+    Fetch (daily, weekly, monthly, h4) candles for a backtest.
+    
+    The other timeframes are only fetched when Daily data exists.
+    """
+    daily = get_ohlcv(asset, timeframe="D", count=2000, use_cache=False) or []
+    if not daily:
+        return [], [], [], []
+    
+    weekly = get_ohlcv(asset, timeframe="W", count=500, use_cache=False) or []
+    monthly = get_ohlcv(asset, timeframe="M", count=240, use_cache=False) or []
+    h4 = get_ohlcv(asset, timeframe="H4", count=2000, use_cache=False) or []
+    return daily, weekly, monthly, h4
+
+
+def run_backtest(
+    asset: str,
+    period: str,
+    profile=None,
+    _bundle: Optional[Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]] = None,
+) -> Dict:
     """
     Walk-forward backtest of the Blueprint strategy.
     
@@ -467,8 +623,14 @@ def run_backtest(asset: str, period: str) -> Dict:
     - Detailed trade logging
     - Conservative exit assumptions
     - The5ers challenge phase simulation
+    
+    profile defaults to ACTIVE_ACCOUNT_PROFILE. _bundle lets callers running
+    several periods over one asset pass a _fetch_ohlcv_bundle result instead
+    of refetching it.
     """
-    daily = get_ohlcv(asset, timeframe="D", count=2000, use_cache=False)
+    if _bundle is None:
+        _bundle = _fetch_ohlcv_bundle(asset)
+    daily, weekly, monthly, h4 = _bundle
     if not daily:
         return {
             "asset": asset,
@@ -477,22 +639,21 @@ def run_backtest(asset: str, period: str) -> Dict:
             "win_rate": 0.0,
             "net_return_pct": 0.0,
             "trades": [],
-            "notes": "No Daily data available.",
+            "notes": NO_DAILY_DATA_NOTE,
         }
 
-    weekly = get_ohlcv(asset, timeframe="W", count=500, use_cache=False) or []
-    monthly = get_ohlcv(asset, timeframe="M", count=240, use_cache=False) or []
-    h4 = get_ohlcv(asset, timeframe="H4", count=2000, use_cache=False) or []
-
-    daily_dates = _build_date_list(daily)
-    weekly_dates = _build_date_list(weekly)
-    monthly_dates = _build_date_list(monthly)
-    h4_dates = _build_date_list(h4)
+    daily, daily_ts, daily_dates = _timed_series(daily, with_dates=True)
+    weekly, weekly_ts, _ = _timed_series(weekly)
+    monthly, monthly_ts, _ = _timed_series(monthly)
+    h4, h4_ts, _ = _timed_series(h4)
     
-    daily_dts = _build_dt_list(daily)
-    weekly_dts = _build_dt_list(weekly)
-    monthly_dts = _build_dt_list(monthly)
-    h4_dts = _build_dt_list(h4)
+    daily_high, daily_low, daily_close = _build_price_columns(daily)
+    daily_end = _prefix_lengths(daily_ts, daily_ts)
+    weekly_end = _prefix_lengths(weekly_ts, daily_ts)
+    monthly_end = _prefix_lengths(monthly_ts, daily_ts)
+    h4_end = _prefix_lengths(h4_ts, daily_ts)
+    daily_atr = _atr_series(daily, 14)
+    daily_pivots = _pivot_series(daily, lookback=3)
 
     start_req, end_req = _parse_period(period)
 
@@ -540,76 +701,76 @@ def run_backtest(asset: str, period: str) -> Dict:
             "notes": "No candles found in requested period.",
         }
 
-    trades: List[Dict] = []
+    trades: List[TradeExit] = []
     open_trade: Optional[Dict] = None
     
     min_trade_conf = 2 if SIGNAL_MODE == "standard" else 1
     cooldown_bars = 0
+    trend_cache: Dict[str, Tuple[int, str]] = {"M": (-1, "mixed"), "W": (-1, "mixed"), "D": (-1, "mixed")}
     last_trade_idx = -1
+    
+    # Local aliases: the per-bar loop below is the backtest's hot path
+    maybe_exit = _maybe_exit_trade
+    cached_trend = _cached_trend
+    pick_direction = _pick_direction_from_bias
+    confluence_flags = _compute_confluence_flags
+    flag_mask = confluence_mask
+    pivot_tail = _pivot_tail
 
     for idx in indices:
-        c = daily[idx]
         d_i = daily_dates[idx]
-        cutoff_dt = daily_dts[idx]
-        if d_i is None or cutoff_dt is None:
+        if d_i is None:
             continue
 
-        high = c["high"]
-        low = c["low"]
-        close = c["close"]
-
-        if open_trade is not None and idx > open_trade["entry_index"]:
-            closed = _maybe_exit_trade(open_trade, high, low, d_i)
-            if closed is not None:
-                trades.append(closed)
-                open_trade = None
-                last_trade_idx = idx
-                continue
-
+        # While a trade is open only its exit is checked; no slicing,
+        # trend or confluence work happens until it closes.
         if open_trade is not None:
+            if idx > open_trade["entry_index"]:
+                closed = maybe_exit(open_trade, daily_high[idx], daily_low[idx], d_i)
+                if closed is not None:
+                    trades.append(closed)
+                    open_trade = None
+                    last_trade_idx = idx
             continue
 
         if idx - last_trade_idx < cooldown_bars:
             continue
 
-        daily_slice = _slice_up_to_dt(daily, daily_dts, cutoff_dt)
-        if len(daily_slice) < 30:
+        n_daily = daily_end[idx]
+        if n_daily < 30:
             continue
+        daily_slice = daily[:n_daily]
 
-        weekly_slice = _slice_up_to_dt(weekly, weekly_dts, cutoff_dt)
+        weekly_slice = weekly[:weekly_end[idx]]
         if not weekly_slice or len(weekly_slice) < 8:
             continue
 
-        monthly_slice = _slice_up_to_dt(monthly, monthly_dts, cutoff_dt)
-        h4_slice = _slice_up_to_dt(h4, h4_dts, cutoff_dt)
+        monthly_slice = monthly[:monthly_end[idx]]
+        h4_slice = h4[:h4_end[idx]]
 
-        mn_trend = _infer_trend(monthly_slice) if monthly_slice else "mixed"
-        wk_trend = _infer_trend(weekly_slice) if weekly_slice else "mixed"
-        d_trend = _infer_trend(daily_slice) if daily_slice else "mixed"
+        mn_trend = cached_trend(trend_cache, "M", monthly_slice)
+        wk_trend = cached_trend(trend_cache, "W", weekly_slice)
+        d_trend = cached_trend(trend_cache, "D", daily_slice)
 
-        direction, _, _ = _pick_direction_from_bias(mn_trend, wk_trend, d_trend)
+        direction, _, _ = pick_direction(mn_trend, wk_trend, d_trend)
 
-        flags, notes, trade_levels = _compute_confluence_flags(
+        flags, _, trade_levels = confluence_flags(
             monthly_slice,
             weekly_slice,
             daily_slice,
             h4_slice,
             direction,
+            daily_atr=daily_atr[n_daily],
+            daily_pivots=pivot_tail(daily_pivots, n_daily),
+            trends=(mn_trend, wk_trend, d_trend),
         )
 
         entry, sl, tp1, tp2, tp3, tp4, tp5 = trade_levels
 
-        confluence_score = sum(1 for v in flags.values() if v)
-
-        has_confirmation = flags.get("confirmation", False)
-        has_rr = flags.get("rr", False)
-        has_location = flags.get("location", False)
-        has_fib = flags.get("fib", False)
-        has_liquidity = flags.get("liquidity", False)
-        has_structure = flags.get("structure", False)
-        has_htf_bias = flags.get("htf_bias", False)
-
-        quality_factors = sum([has_location, has_fib, has_liquidity, has_structure, has_htf_bias])
+        mask = flag_mask(flags)
+        confluence_score = mask.bit_count()
+        has_rr = mask & FLAG_RR
+        quality_factors = (mask & QUALITY_MASK).bit_count()
         
         if has_rr and confluence_score >= min_trade_conf and quality_factors >= 1:
             status = "active"
@@ -626,7 +787,7 @@ def run_backtest(asset: str, period: str) -> Dict:
 
         # Use 4-hour candle close for actual entry execution
         # Signals are based on daily analysis but entered on 4-hour confirmation
-        execution_entry = h4_slice[-1]["close"] if h4_slice else close
+        execution_entry = h4_slice[-1]["close"] if h4_slice else daily_close[idx]
         
         # Recalculate SL and TP based on actual entry price
         risk_theoretical = abs(entry - sl)
@@ -647,6 +808,7 @@ def run_backtest(asset: str, period: str) -> Dict:
         open_trade = {
             "asset": asset,
             "direction": direction,
+            "is_long": direction == "bullish",
             "entry": execution_entry,
             "sl": execution_sl,
             "tp1": execution_tp1,
@@ -656,19 +818,25 @@ def run_backtest(asset: str, period: str) -> Dict:
             "tp5": None,
             "risk": risk,
             "entry_date": d_i,
+            "_entry_date_str": d_i.isoformat(),
             "entry_index": idx,
             "confluence": confluence_score,
         }
 
     account_size = ACCOUNT_SIZE
     risk_per_trade_pct = RISK_PER_TRADE_PCT
-    profile = ACTIVE_ACCOUNT_PROFILE
+    if profile is None:
+        profile = ACTIVE_ACCOUNT_PROFILE
+    
+    # Column view of the trades so each statistic is one pass over a flat list
+    trade_rrs = [t.rr for t in trades]
+    exit_counts = Counter(t.exit_reason for t in trades)
     
     total_trades = len(trades)
     if total_trades > 0:
-        wins = sum(1 for t in trades if t["rr"] > 0)
+        wins = sum(1 for rr in trade_rrs if rr > 0)
         win_rate = wins / total_trades * 100.0
-        total_rr = sum(t["rr"] for t in trades)
+        total_rr = sum(trade_rrs)
         net_return_pct = total_rr * risk_per_trade_pct * 100
         avg_rr = total_rr / total_trades
     else:
@@ -680,24 +848,17 @@ def run_backtest(asset: str, period: str) -> Dict:
     risk_per_trade_usd = account_size * risk_per_trade_pct
     total_profit_usd = total_rr * risk_per_trade_usd
     
-    running_pnl = 0.0
-    max_drawdown = 0.0
-    peak = 0.0
-    
-    for t in trades:
-        running_pnl += t["rr"] * risk_per_trade_usd
-        if running_pnl > peak:
-            peak = running_pnl
-        drawdown = peak - running_pnl
-        if drawdown > max_drawdown:
-            max_drawdown = drawdown
+    equity = list(accumulate(rr * risk_per_trade_usd for rr in trade_rrs))
+    peaks = accumulate(equity, max, initial=0.0)
+    next(peaks)  # drop the 0.0 seed so peaks[i] lines up with equity[i]
+    max_drawdown = max((peak - pnl for peak, pnl in zip(peaks, equity)), default=0.0)
     
     max_drawdown_pct = (max_drawdown / account_size) * 100 if account_size > 0 else 0.0
 
-    tp1_trail_hits = sum(1 for t in trades if t.get("exit_reason") == "TP1+Trail")
-    tp2_hits = sum(1 for t in trades if t.get("exit_reason") == "TP2")
-    tp3_hits = sum(1 for t in trades if t.get("exit_reason") == "TP3")
-    sl_hits = sum(1 for t in trades if t.get("exit_reason") == "SL")
+    tp1_trail_hits = exit_counts["TP1+Trail"]
+    tp2_hits = exit_counts["TP2"]
+    tp3_hits = exit_counts["TP3"]
+    sl_hits = exit_counts["SL"]
     
     wins = tp1_trail_hits + tp2_hits + tp3_hits
 
@@ -746,6 +907,10 @@ def run_backtest(asset: str, period: str) -> Dict:
         "tp3_hits": tp3_hits,
         "sl_hits": sl_hits,
         "trades": trades,
+        "trade_columns": {
+            "exit_day": [date.fromisoformat(t.exit_date).toordinal() for t in trades],
+            "rr": trade_rrs,
+        },
         "notes": notes_text,
         "account_size": account_size,
         "risk_per_trade_pct": risk_per_trade_pct,
@@ -793,10 +958,14 @@ def validate_asset_performance(result: dict) -> dict:
     return validations
 
 
-def run_yearly_backtest(asset: str, year: int, profile=None):
+def run_yearly_backtest(asset: str, year: int, profile=None, processes: bool = False):
     """
     Run backtest for each month of a year and aggregate per-asset metrics.
     
+    Months run serially by default. processes=True runs them in a process
+    pool; that forks, so it is for offline runs only (the __main__ entry),
+    never from the bot.
+    
     Returns yearly summary with monthly breakdown and performance validation.
     """
     from config import ACTIVE_ACCOUNT_PROFILE
@@ -815,6 +984,7 @@ def run_yearly_backtest(asset: str, year: int, profile=None):
     print(f"Profile: {profile.display_name}")
     print(f"{'='*60}\n")
     
+    periods = []
     for month in range(1, 13):
         month_name = calendar.month_name[month]
         start_day = 1
@@ -824,26 +994,57 @@ def run_yearly_backtest(asset: str, year: int, profile=None):
         else:
             end_day = calendar.monthrange(year, month + 1)[1] - 1
         
-        period = f"{month_name} 1 - {end_day}, {year}"
-        
+        periods.append((month, f"{month_name} 1 - {end_day}, {year}"))
+    
+    # One fetch serves all twelve months
+    bundle = _fetch_ohlcv_bundle(asset)
+    
+    # Months are independent and CPU-bound, so offline callers can run them
+    # in worker processes when the profile can be shipped to them
+    picklable = False
+    if processes:
         try:
-            result = run_backtest(asset, period, profile)
-            monthly_results.append(result)
-            yearly_trades.extend(result.get("trades", []))
-            yearly_profit += result["total_profit_usd"]
-            yearly_return += result["net_return_pct"]
-            
-            status = "✓" if result["win_rate"] >= 50 else "✗"
-            print(f"{month_name:>10}: {status} WR={result['win_rate']:5.1f}% | "
-                  f"Trades={result['total_trades']:3.0f} | "
-                  f"Return={result['net_return_pct']:+6.1f}%")
-        except Exception as e:
-            print(f"{month_name:>10}: ERROR - {str(e)[:40]}")
+            pickle.dumps(profile)
+            picklable = True
+        except Exception:
+            pass
+    
+    outcomes: Dict[int, object] = {}
+    if picklable:
+        with ProcessPoolExecutor(max_workers=min(12, os.cpu_count() or 1)) as ex:
+            futures = {ex.submit(run_backtest, asset, period, profile, bundle): month for month, period in periods}
+            for fut in as_completed(futures):
+                try:
+                    outcomes[futures[fut]] = fut.result()
+                except Exception as e:
+                    outcomes[futures[fut]] = e
+    else:
+        for month, period in periods:
+            try:
+                outcomes[month] = run_backtest(asset, period, profile, bundle)
+            except Exception as e:
+                outcomes[month] = e
+    
+    for month, _ in periods:
+        month_name = calendar.month_name[month]
+        result = outcomes[month]
+        if isinstance(result, Exception):
+            print(f"{month_name:>10}: ERROR - {str(result)[:40]}")
             continue
+        
+        monthly_results.append(result)
+        yearly_trades.extend(result.get("trades", []))
+        yearly_profit += result["total_profit_usd"]
+        yearly_return += result["net_return_pct"]
+        
+        status = "✓" if result["win_rate"] >= 50 else "✗"
+        print(f"{month_name:>10}: {status} WR={result['win_rate']:5.1f}% | "
+              f"Trades={result['total_trades']:3.0f} | "
+              f"Return={result['net_return_pct']:+6.1f}%")
     
     total_trades = len(yearly_trades)
-    yearly_win_rate = sum(1 for t in yearly_trades if t["rr"] > 0) / total_trades * 100 if total_trades > 0 else 0
-    avg_rr = sum(t["rr"] for t in yearly_trades) / total_trades if total_trades > 0 else 0
+    yearly_win_rate = sum(1 for t in yearly_trades if t.rr > 0) / total_trades * 100 if total_trades > 0 else 0
+    avg_rr = sum(t.rr for t in yearly_trades) / total_trades if total_trades > 0 else 0
     
     print(f"\n{'='*60}")
     print(f"YEARLY SUMMARY: {asset} / {year}")
@@ -868,3 +1069,19 @@ def run_yearly_backtest(asset: str, year: int, profile=None):
     yearly_result["validation"] = validate_asset_performance(yearly_result)
     
     return yearly_result
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python backtest.py <asset> <year>")
+        print("Example: python backtest.py EUR_USD 2024")
+        sys.exit(1)
+    
+    try:
+        year = int(sys.argv[2])
+    except ValueError:
+        print("Year must be a number, e.g. 2024")
+        sys.exit(1)
+    
+    result = run_yearly_backtest(sys.argv[1].upper().replace("/", "_"), year, processes=True)
+    print("Status: " + ("APPROVED" if result["validation"]["all_pass"] else "NEEDS WORK"))
@@ -12,26 +12,40 @@ Features:
 - Detailed reporting of pass/fail results
 """
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Any, Union
+from dataclasses import asdict, dataclass, fields
 import calendar
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import accumulate
+from pathlib import Path
 
 from data import get_ohlcv
 from config import (
-    FOREX_PAIRS,
-    METALS,
-    INDICES,
-    ENERGIES,
-    CRYPTO_ASSETS,
+    ALL_MARKET_INSTRUMENTS,
     ACCOUNT_SIZE,
     RISK_PER_TRADE_PCT,
 )
 from account_profiles import AccountProfile, get_active_profile
-from backtest import run_backtest
+import backtest
+import config
+import strategy_core
+from backtest import run_backtest, TradeExit, _fetch_ohlcv_bundle, NO_DAILY_DATA_NOTE
 
+CHALLENGE_CACHE_DIR = Path(__file__).parent / ".cache" / "challenge"
 
-@dataclass
+# Bump to invalidate cached month results when the simulation rules change
+CHALLENGE_CACHE_VERSION = 2
+
+
+@dataclass(slots=True)
 class ChallengeResult:
     """
     Results from a challenge simulation.
@@ -81,46 +95,88 @@ class ChallengeResult:
     phase2_profit_pct: float = 0.0
     phase2_days: int = 0
     
-    trades: List[Dict] = field(default_factory=list)
+    # Only populated when the caller asks for retain_trades
+    trades: Optional[List[TradeExit]] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for reporting."""
-        return {
-            "year": self.year,
-            "month": self.month,
-            "phase1_passed": self.phase1_passed,
-            "phase2_passed": self.phase2_passed,
-            "both_passed": self.both_passed,
-            "days_to_pass": self.days_to_pass,
-            "profit_at_completion_pct": self.profit_at_completion_pct,
-            "profit_at_completion_usd": self.profit_at_completion_usd,
-            "trades_at_completion": self.trades_at_completion,
-            "full_month_profit_pct": self.full_month_profit_pct,
-            "full_month_profit_usd": self.full_month_profit_usd,
-            "full_month_trades": self.full_month_trades,
-            "full_month_win_rate": self.full_month_win_rate,
-            "total_profit_pct": self.total_profit_pct,
-            "total_profit_usd": self.total_profit_usd,
-            "total_trades": self.total_trades,
-            "max_daily_drawdown_pct": self.max_daily_drawdown_pct,
-            "max_total_drawdown_pct": self.max_total_drawdown_pct,
-            "daily_loss_violations": self.daily_loss_violations,
-            "total_loss_violations": self.total_loss_violations,
-            "trading_days": self.trading_days,
-            "profitable_days": self.profitable_days,
-            "failure_reason": self.failure_reason,
-            "phase1_profit_pct": self.phase1_profit_pct,
-            "phase1_days": self.phase1_days,
-            "phase2_profit_pct": self.phase2_profit_pct,
-            "phase2_days": self.phase2_days,
-        }
+        """Convert to dictionary for reporting (summary fields, no trades)."""
+        return {name: getattr(self, name) for name in _SUMMARY_FIELDS}
+    
+    def to_dict_full(self) -> Dict[str, Any]:
+        """Like to_dict, plus the trades as plain dicts."""
+        d = self.to_dict()
+        d["trades"] = [asdict(t) for t in self.trades or ()]
+        return d
+
+
+_SUMMARY_FIELDS = tuple(f.name for f in fields(ChallengeResult) if f.name != "trades")
 
 
 def get_all_tradeable_assets() -> List[str]:
     """Get all tradeable assets."""
-    return sorted(set(
-        FOREX_PAIRS + METALS + INDICES + ENERGIES + CRYPTO_ASSETS
-    ))
+    return list(ALL_MARKET_INSTRUMENTS)
+
+
+def _backtest_one(
+    asset: str,
+    period_str: str,
+    bundle: Optional[Tuple] = None,
+) -> Tuple[str, Union[Dict, Exception]]:
+    """Backtest one asset in a worker process; errors are returned, not raised."""
+    try:
+        return asset, run_backtest(asset, period_str, _bundle=bundle)
+    except Exception as e:
+        return asset, e
+
+
+def _write_lines(lines: List[str]) -> None:
+    """Write lines to stdout in one call with a single flush."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+
+def _first_reaching(balances: List[float], lo: int, hi: int, start_balance: float, target: float) -> int:
+    """
+    First index i in [lo, hi) where (balances[i] - start_balance) / start_balance >= target, else -1.
+    
+    The running max of the profit column is non-decreasing, so the first
+    crossing is a bisect on it.
+    """
+    if lo >= hi:
+        return -1
+    peaks = list(accumulate(((b - start_balance) / start_balance for b in balances[lo:hi]), max))
+    k = bisect_left(peaks, target)
+    return lo + k if k < len(peaks) else -1
+
+
+def _phase_passes(
+    balances: List[float],
+    stop: int,
+    account_size: float,
+    phase1_target: float,
+    phase2_target: float,
+) -> Tuple[int, float, int, float]:
+    """
+    Find where Phase 1 and Phase 2 are passed on the balance column.
+    
+    Phase 1 measures profit from account_size; Phase 2 from the balance at
+    which Phase 1 passed, starting with the next trade. Only balances[:stop]
+    are considered.
+    
+    Returns (phase1_idx, phase1_profit, phase2_idx, phase2_profit), with
+    an index of -1 for a phase that was not passed.
+    """
+    phase1_idx = _first_reaching(balances, 0, stop, account_size, phase1_target)
+    if phase1_idx < 0:
+        return -1, 0.0, -1, 0.0
+    phase1_profit = (balances[phase1_idx] - account_size) / account_size
+    
+    start_balance = balances[phase1_idx]
+    phase2_idx = _first_reaching(balances, phase1_idx + 1, stop, start_balance, phase2_target)
+    if phase2_idx < 0:
+        return phase1_idx, phase1_profit, -1, 0.0
+    return phase1_idx, phase1_profit, phase2_idx, (balances[phase2_idx] - start_balance) / start_balance
 
 
 def simulate_challenge_for_month(
@@ -128,6 +184,11 @@ def simulate_challenge_for_month(
     month: int,
     profile: Optional[AccountProfile] = None,
     assets: Optional[List[str]] = None,
+    bundles: Optional[Dict[str, Tuple]] = None,
+    use_cache: bool = True,
+    retain_trades: bool = False,
+    bt_results: Optional[Dict[str, Union[Dict, Exception]]] = None,
+    processes: bool = False,
 ) -> ChallengeResult:
     """
     Simulate a The5ers challenge for a specific month/year.
@@ -135,11 +196,25 @@ def simulate_challenge_for_month(
     Uses the unified strategy logic from backtest.py to simulate trades,
     then applies challenge rules to determine if phases would be passed.
     
+    Results for completed months are pickled under CHALLENGE_CACHE_DIR,
+    keyed on the inputs and the strategy source, so repeated runs reuse them.
+    Months where any asset's backtest failed or had no data are not cached,
+    so a later run with working data recomputes them.
+    
     Args:
         year: Calendar year (e.g., 2024)
         month: Calendar month (1-12)
         profile: Account profile to use (defaults to active profile)
         assets: Assets to trade (defaults to all tradeable assets)
+        bundles: Prefetched OHLCV per asset (see backtest._fetch_ohlcv_bundle);
+            assets missing from it are fetched by their backtest
+        use_cache: Read/write the on-disk result cache
+        retain_trades: Keep the individual trades on result.trades; summary-only
+            callers leave this off so the trade objects can be freed
+        bt_results: Per-asset run_backtest results (or exceptions) for this
+            month, when the caller already ran them; otherwise they are run here
+        processes: Run the backtests in a process pool (offline use only, see
+            _run_backtests)
     
     Returns:
         ChallengeResult with detailed simulation results
@@ -150,37 +225,209 @@ def simulate_challenge_for_month(
     if assets is None:
         assets = get_all_tradeable_assets()
     
-    result = ChallengeResult(year=year, month=month)
+    cache_path = _cache_path(year, month, profile, assets, retain_trades) if use_cache else None
+    if cache_path is not None:
+        try:
+            with open(cache_path, "rb") as f:
+                result = pickle.load(f)
+            print(f"[Challenge Simulator] Using cached result for {calendar.month_name[month]} {year}")
+            return result
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[Challenge Simulator] Ignoring unreadable cache entry {cache_path.name}: {e}")
     
+    result, complete = _simulate_month(
+        year, month, profile, assets, bundles, retain_trades, bt_results, processes
+    )
+    
+    if cache_path is not None and not complete:
+        print(f"[Challenge Simulator] Not caching {calendar.month_name[month]} {year}: some assets failed or had no data")
+    elif cache_path is not None:
+        try:
+            CHALLENGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"[Challenge Simulator] Could not write cache entry: {e}")
+    
+    return result
+
+
+@lru_cache(maxsize=1)
+def _strategy_code_hash() -> str:
+    """Hash of the simulator, backtest, strategy and config source, so edits invalidate cached months."""
+    h = hashlib.blake2b(digest_size=16)
+    for module in (sys.modules[__name__], backtest, strategy_core, config):
+        h.update(inspect.getsource(module).encode())
+    return h.hexdigest()
+
+
+def _cache_key(
+    year: int,
+    month: int,
+    profile: AccountProfile,
+    assets: List[str],
+    retain_trades: bool,
+) -> str:
+    """Content-addressed key for one month's ChallengeResult."""
+    payload = repr((
+        CHALLENGE_CACHE_VERSION,
+        year,
+        month,
+        profile,
+        tuple(assets),
+        retain_trades,
+        config.SIGNAL_MODE,
+        _strategy_code_hash(),
+    ))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _cache_path(
+    year: int,
+    month: int,
+    profile: AccountProfile,
+    assets: List[str],
+    retain_trades: bool,
+) -> Optional[Path]:
+    """Cache file for a month's result, or None if the month is not over yet."""
+    _, last_day = calendar.monthrange(year, month)
+    if date(year, month, last_day) >= date.today():
+        return None
+    return CHALLENGE_CACHE_DIR / f"{_cache_key(year, month, profile, assets, retain_trades)}.pkl"
+
+
+def _month_period(year: int, month: int) -> str:
+    """Backtest period string covering a whole calendar month."""
     _, last_day = calendar.monthrange(year, month)
     start_date = date(year, month, 1)
     end_date = date(year, month, last_day)
-    period_str = f"{start_date.strftime('%d %b %Y')} - {end_date.strftime('%d %b %Y')}"
+    return f"{start_date.strftime('%d %b %Y')} - {end_date.strftime('%d %b %Y')}"
+
+
+def _run_backtests(
+    jobs: List[Tuple[str, str]],
+    bundles: Optional[Dict[str, Tuple]],
+    processes: bool = False,
+) -> Dict[Tuple[str, str], Union[Dict, Exception]]:
+    """
+    Run independent (period_str, asset) backtests.
     
-    all_trades: List[Dict] = []
+    By default they run serially in this process, after fetching each asset's
+    candles once here. processes=True runs them in a process pool instead;
+    that forks, so it is only for offline runs (the __main__ entry), never
+    from inside the bot where other threads may hold locks.
     
-    print(f"\n[Challenge Simulator] Running simulation for {calendar.month_name[month]} {year}")
-    print(f"[Challenge Simulator] Assets: {len(assets)}, Period: {period_str}")
-    print(f"[Challenge Simulator] Profile: {profile.display_name}")
+    Returns:
+        Result (or the exception raised) keyed by (period_str, asset)
+    """
+    results: Dict[Tuple[str, str], Union[Dict, Exception]] = {}
+    if not jobs:
+        return results
+    bundles = dict(bundles or {})
+    
+    if processes:
+        with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as ex:
+            futures = {
+                ex.submit(_backtest_one, asset, period_str, bundles.get(asset)): period_str
+                for period_str, asset in jobs
+            }
+            for fut in as_completed(futures):
+                asset, bt_result = fut.result()
+                results[(futures[fut], asset)] = bt_result
+        return results
+    
+    fetch_errors: Dict[str, Exception] = {}
+    for _, asset in jobs:
+        if asset not in bundles and asset not in fetch_errors:
+            try:
+                bundles[asset] = _fetch_ohlcv_bundle(asset)
+            except Exception as e:
+                fetch_errors[asset] = e
+    for period_str, asset in jobs:
+        if asset in fetch_errors:
+            results[(period_str, asset)] = fetch_errors[asset]
+        else:
+            results[(period_str, asset)] = _backtest_one(asset, period_str, bundles[asset])[1]
+    return results
+
+
+def _simulate_month(
+    year: int,
+    month: int,
+    profile: AccountProfile,
+    assets: List[str],
+    bundles: Optional[Dict[str, Tuple]],
+    retain_trades: bool,
+    bt_results: Optional[Dict[str, Union[Dict, Exception]]],
+    processes: bool = False,
+) -> Tuple[ChallengeResult, bool]:
+    """
+    Uncached body of simulate_challenge_for_month.
     
+    Returns the result and whether every asset's backtest ran on real data
+    (no exception, no empty candle fetch), i.e. whether it may be cached.
+    """
+    result = ChallengeResult(year=year, month=month)
+    period_str = _month_period(year, month)
+    
+    all_trades: List[TradeExit] = []
+    
+    # Progress lines are buffered and written once per month rather than
+    # one print (and flush) each; the header goes out before the backtests.
+    _write_lines([
+        f"\n[Challenge Simulator] Running simulation for {calendar.month_name[month]} {year}",
+        f"[Challenge Simulator] Assets: {len(assets)}, Period: {period_str}",
+        f"[Challenge Simulator] Profile: {profile.display_name}",
+    ])
+    log: List[str] = []
+    
+    # Per-asset backtests are independent; only the rule walk below is sequential
+    if bt_results is None:
+        ran = _run_backtests([(period_str, asset) for asset in assets], bundles, processes)
+        bt_results = {asset: ran[(period_str, asset)] for asset in assets}
+    
+    # Merge in asset order so same-day trades keep a deterministic order.
+    # The (exit_day, rr) columns are concatenated alongside the trades and
+    # all three are put in exit-date order with one shared permutation.
+    # Days are proleptic ordinals, so sorting and day changes are int compares.
+    exit_days: List[int] = []
+    exit_rrs: List[float] = []
+    complete = True
     for asset in assets:
-        try:
-            bt_result = run_backtest(asset, period_str)
-            if bt_result.get("trades"):
-                for trade in bt_result["trades"]:
-                    trade["asset"] = asset
-                    all_trades.append(trade)
-        except Exception as e:
-            print(f"[Challenge Simulator] Error backtesting {asset}: {e}")
+        bt_result = bt_results[asset]
+        if isinstance(bt_result, Exception):
+            log.append(f"[Challenge Simulator] Error backtesting {asset}: {bt_result}")
+            complete = False
             continue
+        if bt_result.get("notes") == NO_DAILY_DATA_NOTE:
+            complete = False
+        trades = bt_result.get("trades") or []
+        for trade in trades:
+            trade.asset = asset
+        all_trades.extend(trades)
+        columns = bt_result.get("trade_columns")
+        if columns is None:
+            columns = {
+                "exit_day": [date.fromisoformat(t.exit_date).toordinal() for t in trades],
+                "rr": [t.rr for t in trades],
+            }
+        exit_days.extend(columns["exit_day"])
+        exit_rrs.extend(columns["rr"])
     
     if not all_trades:
         result.failure_reason = "No trades generated during this period"
-        return result
+        _write_lines(log)
+        return result, complete
     
-    all_trades.sort(key=lambda t: t.get("exit_date", t.get("entry_date", "")))
+    order = sorted(range(len(all_trades)), key=exit_days.__getitem__)
+    all_trades = [all_trades[i] for i in order]
+    trade_days = [exit_days[i] for i in order]
+    rrs = [exit_rrs[i] for i in order]
     
-    result.trades = all_trades
+    if retain_trades:
+        result.trades = all_trades
     
     account_size = profile.starting_balance
     risk_per_trade_pct = profile.risk_per_trade_pct
@@ -193,99 +440,97 @@ def simulate_challenge_for_month(
     min_profitable_days = profile.phases[0].min_profitable_days if profile.phases else 3
     min_profit_per_day = profile.phases[0].min_profit_per_day_pct if profile.phases else 0.005
     
-    balance = account_size
-    peak_balance = account_size
-    phase1_start_balance = account_size
-    phase2_start_balance = account_size
+    # Trades are sorted by exit day, so each trading day is one contiguous
+    # run: a new day starts whenever the day changes, and no per-day dict
+    # is needed.
+    pnls = [rr * risk_per_trade_usd for rr in rrs]
+    balances = list(accumulate(pnls, initial=account_size))[1:]
+    
+    day_numbers: List[int] = []
+    day_running: List[float] = []
+    day_totals: List[float] = []
+    prev_day = -1
+    day_pnl = 0.0
+    for trade_day, pnl_usd in zip(trade_days, pnls):
+        if trade_day != prev_day:
+            if prev_day >= 0:
+                day_totals.append(day_pnl)
+            prev_day = trade_day
+            day_pnl = 0.0
+        day_pnl += pnl_usd
+        day_running.append(day_pnl)
+        day_numbers.append(len(day_totals) + 1)
+    day_totals.append(day_pnl)
+    
+    trade_count = len(all_trades)
+    wins_count = sum(1 for rr in rrs if rr > 0)
+    balance = balances[-1]
+    
+    daily_limit_usd = account_size * max_daily_loss
+    total_limit_usd = account_size * max_total_loss
+    first_daily = next(
+        (i for i, day_loss in enumerate(day_running) if day_loss < 0 and abs(day_loss) > daily_limit_usd),
+        trade_count,
+    )
+    # Only a total-loss breach strictly before the first daily breach can
+    # change the outcome, so stop scanning there (daily wins ties).
+    first_total = next(
+        (i for i in range(first_daily) if account_size - balances[i] > total_limit_usd),
+        first_daily,
+    )
+    fail_idx = first_total
+    challenge_failed = fail_idx < trade_count
+    
+    result.max_daily_drawdown_pct = max(
+        0.0, max(abs(day_loss) / account_size * 100 if day_loss < 0 else 0 for day_loss in day_running)
+    )
+    result.max_total_drawdown_pct = max(
+        0.0, max((account_size - bal) / account_size * 100 if account_size - bal > 0 else 0 for bal in balances)
+    )
+    
+    # Phase progression stops at the first rule breach
+    phase1_idx, phase1_profit, phase2_idx, phase2_profit = _phase_passes(
+        balances, fail_idx, account_size, phase1_target, phase2_target
+    )
     
-    daily_pnl: Dict[str, float] = {}
-    current_phase = 1
-    phase1_complete_day = 0
     phase2_complete_day = 0
-    
-    trading_day_count = 0
-    trade_count = 0
-    wins_count = 0
-    
-    challenge_failed = False
-    challenge_completed = False
-    balance_at_completion = account_size
-    trades_at_completion = 0
-    
-    for trade in all_trades:
-        trade_date = trade.get("exit_date", trade.get("entry_date", ""))
-        rr = trade.get("rr", 0)
-        pnl_usd = rr * risk_per_trade_usd
-        
-        if trade_date not in daily_pnl:
-            daily_pnl[trade_date] = 0.0
-            trading_day_count += 1
-        daily_pnl[trade_date] += pnl_usd
-        
-        balance += pnl_usd
-        trade_count += 1
-        if rr > 0:
-            wins_count += 1
+    if phase1_idx >= 0:
+        phase1_complete_day = day_numbers[phase1_idx]
+        result.phase1_passed = True
+        result.phase1_profit_pct = phase1_profit * 100
+        result.phase1_days = phase1_complete_day
+        log.append(f"[Challenge Simulator] Phase 1 passed on day {phase1_complete_day}: +{phase1_profit*100:.1f}%")
         
-        if balance > peak_balance:
-            peak_balance = balance
-        
-        day_loss = daily_pnl[trade_date]
-        if not challenge_failed and day_loss < 0 and abs(day_loss) > account_size * max_daily_loss:
+        if phase2_idx >= 0:
+            phase2_complete_day = day_numbers[phase2_idx]
+            balance_i = balances[phase2_idx]
+            result.phase2_passed = True
+            result.phase2_profit_pct = phase2_profit * 100
+            result.phase2_days = phase2_complete_day - phase1_complete_day
+            result.profit_at_completion_usd = balance_i - account_size
+            result.profit_at_completion_pct = (balance_i - account_size) / account_size * 100
+            result.trades_at_completion = phase2_idx + 1
+            
+            log.append(f"[Challenge Simulator] Phase 2 passed on day {phase2_complete_day}: +{phase2_profit*100:.1f}%")
+            log.append(f"[Challenge Simulator] Continuing to process remaining trades for full-month metrics...")
+    
+    if challenge_failed:
+        trade_date = all_trades[fail_idx].exit_date
+        if first_daily == fail_idx:
+            day_loss = day_running[fail_idx]
             result.daily_loss_violations += 1
-            challenge_failed = True
             result.failure_reason = f"Daily loss limit breached ({abs(day_loss)/account_size*100:.1f}% > {max_daily_loss*100:.0f}%)"
-            print(f"[Challenge Simulator] FAILED: Daily loss limit breached on {trade_date}")
-        
-        total_dd = account_size - balance
-        if not challenge_failed and total_dd > account_size * max_total_loss:
+            log.append(f"[Challenge Simulator] FAILED: Daily loss limit breached on {trade_date}")
+        else:
+            total_dd = account_size - balances[fail_idx]
             result.total_loss_violations += 1
-            challenge_failed = True
             result.failure_reason = f"Total loss limit breached ({total_dd/account_size*100:.1f}% > {max_total_loss*100:.0f}%)"
-            print(f"[Challenge Simulator] FAILED: Total loss limit breached on {trade_date}")
-        
-        daily_dd_pct = abs(day_loss) / account_size * 100 if day_loss < 0 else 0
-        if daily_dd_pct > result.max_daily_drawdown_pct:
-            result.max_daily_drawdown_pct = daily_dd_pct
-        
-        total_dd_pct = total_dd / account_size * 100 if total_dd > 0 else 0
-        if total_dd_pct > result.max_total_drawdown_pct:
-            result.max_total_drawdown_pct = total_dd_pct
-        
-        if not challenge_failed and not challenge_completed:
-            if current_phase == 1:
-                phase1_profit = (balance - phase1_start_balance) / phase1_start_balance
-                if phase1_profit >= phase1_target:
-                    result.phase1_passed = True
-                    result.phase1_profit_pct = phase1_profit * 100
-                    result.phase1_days = trading_day_count
-                    phase1_complete_day = trading_day_count
-                    
-                    current_phase = 2
-                    phase2_start_balance = balance
-                    print(f"[Challenge Simulator] Phase 1 passed on day {trading_day_count}: +{phase1_profit*100:.1f}%")
-            elif current_phase == 2:
-                phase2_profit = (balance - phase2_start_balance) / phase2_start_balance
-                if phase2_profit >= phase2_target:
-                    result.phase2_passed = True
-                    result.phase2_profit_pct = phase2_profit * 100
-                    result.phase2_days = trading_day_count - phase1_complete_day
-                    phase2_complete_day = trading_day_count
-                    
-                    challenge_completed = True
-                    balance_at_completion = balance
-                    trades_at_completion = trade_count
-                    result.profit_at_completion_usd = balance - account_size
-                    result.profit_at_completion_pct = (balance - account_size) / account_size * 100
-                    result.trades_at_completion = trade_count
-                    
-                    print(f"[Challenge Simulator] Phase 2 passed on day {trading_day_count}: +{phase2_profit*100:.1f}%")
-                    print(f"[Challenge Simulator] Continuing to process remaining trades for full-month metrics...")
-    
-    result.trading_days = len(daily_pnl)
+            log.append(f"[Challenge Simulator] FAILED: Total loss limit breached on {trade_date}")
+    
+    result.trading_days = len(day_totals)
     
     min_day_profit_usd = account_size * min_profit_per_day
-    result.profitable_days = sum(1 for pnl in daily_pnl.values() if pnl >= min_day_profit_usd)
+    result.profitable_days = sum(1 for pnl in day_totals if pnl >= min_day_profit_usd)
     
     result.full_month_profit_usd = balance - account_size
     result.full_month_profit_pct = (balance - account_size) / account_size * 100
@@ -315,7 +560,8 @@ def simulate_challenge_for_month(
     elif not result.phase2_passed:
         result.failure_reason = f"Phase 2 target ({phase2_target*100:.0f}%) not reached after Phase 1"
     
-    return result
+    _write_lines(log)
+    return result, complete
 
 
 def format_challenge_result(result: ChallengeResult) -> str:
@@ -329,56 +575,58 @@ def format_challenge_result(result: ChallengeResult) -> str:
     This addresses the user's requirement to clearly distinguish between
     "profit at completion" vs "full month profit including all trades."
     """
-    month_abbr = calendar.month_abbr[result.month]
     month_name = calendar.month_name[result.month]
-    
-    lines = [
-        f"**Challenge Simulation: {month_name} {result.year}**",
-        "",
-        "=" * 40,
-        "**A. CHALLENGE RESULTS (Completion Metrics)**",
-        "=" * 40,
-    ]
+    rule = "=" * 40
     
     if result.both_passed:
-        lines.append(f"Phase 1: PASSED (+{result.phase1_profit_pct:.1f}% in {result.phase1_days} days)")
-        lines.append(f"Phase 2: PASSED (+{result.phase2_profit_pct:.1f}% in {result.phase2_days} days)")
-        lines.append("")
-        lines.append(f"**CHALLENGE PASSED in {result.days_to_pass} trading days**")
-        lines.append(f"Profit at Completion: +{result.profit_at_completion_pct:.1f}% (+${result.profit_at_completion_usd:,.0f})")
-        lines.append(f"Trades at Completion: {result.trades_at_completion}")
+        outcome = (
+            f"Phase 1: PASSED (+{result.phase1_profit_pct:.1f}% in {result.phase1_days} days)\n"
+            f"Phase 2: PASSED (+{result.phase2_profit_pct:.1f}% in {result.phase2_days} days)\n"
+            f"\n"
+            f"**CHALLENGE PASSED in {result.days_to_pass} trading days**\n"
+            f"Profit at Completion: +{result.profit_at_completion_pct:.1f}% (+${result.profit_at_completion_usd:,.0f})\n"
+            f"Trades at Completion: {result.trades_at_completion}"
+        )
     else:
-        lines.append(f"Phase 1: {'PASSED' if result.phase1_passed else 'FAILED'}")
-        lines.append(f"Phase 2: {'PASSED' if result.phase2_passed else 'FAILED'}")
-        lines.append("")
-        lines.append(f"**CHALLENGE FAILED**")
-        lines.append(f"Reason: {result.failure_reason}")
-    
-    lines.append("")
-    lines.append("=" * 40)
-    lines.append("**B. FULL-MONTH PERFORMANCE (All Trades)**")
-    lines.append("=" * 40)
-    lines.append(f"Total Profit: {'+' if result.full_month_profit_pct >= 0 else ''}{result.full_month_profit_pct:.1f}% (${result.full_month_profit_usd:+,.0f})")
-    lines.append(f"Total Trades: {result.full_month_trades}")
-    lines.append(f"Win Rate: {result.full_month_win_rate:.1f}%")
-    lines.append(f"Trading Days: {result.trading_days}")
-    lines.append(f"Profitable Days: {result.profitable_days}")
-    
-    lines.append("")
-    lines.append("=" * 40)
-    lines.append("**C. RISK METRICS (Full Month)**")
-    lines.append("=" * 40)
-    lines.append(f"Max Daily Drawdown: -{result.max_daily_drawdown_pct:.1f}%")
-    lines.append(f"Max Total Drawdown: -{result.max_total_drawdown_pct:.1f}%")
-    lines.append(f"Daily Loss Violations: {result.daily_loss_violations}")
-    lines.append(f"Total Loss Violations: {result.total_loss_violations}")
-    
-    return "\n".join(lines)
+        outcome = (
+            f"Phase 1: {'PASSED' if result.phase1_passed else 'FAILED'}\n"
+            f"Phase 2: {'PASSED' if result.phase2_passed else 'FAILED'}\n"
+            f"\n"
+            f"**CHALLENGE FAILED**\n"
+            f"Reason: {result.failure_reason}"
+        )
+    
+    return (
+        f"**Challenge Simulation: {month_name} {result.year}**\n"
+        f"\n"
+        f"{rule}\n"
+        f"**A. CHALLENGE RESULTS (Completion Metrics)**\n"
+        f"{rule}\n"
+        f"{outcome}\n"
+        f"\n"
+        f"{rule}\n"
+        f"**B. FULL-MONTH PERFORMANCE (All Trades)**\n"
+        f"{rule}\n"
+        f"Total Profit: {'+' if result.full_month_profit_pct >= 0 else ''}{result.full_month_profit_pct:.1f}% (${result.full_month_profit_usd:+,.0f})\n"
+        f"Total Trades: {result.full_month_trades}\n"
+        f"Win Rate: {result.full_month_win_rate:.1f}%\n"
+        f"Trading Days: {result.trading_days}\n"
+        f"Profitable Days: {result.profitable_days}\n"
+        f"\n"
+        f"{rule}\n"
+        f"**C. RISK METRICS (Full Month)**\n"
+        f"{rule}\n"
+        f"Max Daily Drawdown: -{result.max_daily_drawdown_pct:.1f}%\n"
+        f"Max Total Drawdown: -{result.max_total_drawdown_pct:.1f}%\n"
+        f"Daily Loss Violations: {result.daily_loss_violations}\n"
+        f"Total Loss Violations: {result.total_loss_violations}"
+    )
 
 
 def run_yearly_challenge_analysis(
     year: int,
     profile: Optional[AccountProfile] = None,
+    processes: bool = False,
 ) -> List[ChallengeResult]:
     """
     Run challenge simulations for all 12 months of a year.
@@ -386,18 +634,50 @@ def run_yearly_challenge_analysis(
     Args:
         year: Calendar year to analyze
         profile: Account profile to use
+        processes: Run the backtests in a process pool (offline use only)
     
     Returns:
         List of ChallengeResult for each month
     """
     results = []
     
-    print(f"\n{'='*60}")
-    print(f"YEARLY CHALLENGE ANALYSIS: {year}")
-    print(f"{'='*60}")
+    _write_lines([f"\n{'='*60}", f"YEARLY CHALLENGE ANALYSIS: {year}", "=" * 60])
+    
+    if profile is None:
+        profile = get_active_profile()
+    assets = get_all_tradeable_assets()
+    
+    pending = []
+    for month in range(1, 13):
+        cache_path = _cache_path(year, month, profile, assets, False)
+        if cache_path is None or not cache_path.exists():
+            pending.append(month)
+    
+    # Every month backtests the same candles, so fetch each asset once
+    bundles: Dict[str, Tuple] = {}
+    for asset in assets if pending else ():
+        try:
+            bundles[asset] = _fetch_ohlcv_bundle(asset)
+        except Exception as e:
+            print(f"[Challenge Simulator] Error fetching {asset}: {e}")
+    
+    # Months are independent too: run every uncached (month, asset) backtest
+    # in one pool so workers stay busy across month boundaries without
+    # nesting a pool per month.
+    ran = _run_backtests(
+        [(_month_period(year, month), asset) for month in pending for asset in assets],
+        bundles,
+        processes,
+    )
     
     for month in range(1, 13):
-        result = simulate_challenge_for_month(year, month, profile)
+        period_str = _month_period(year, month)
+        bt_results = (
+            {asset: ran[(period_str, asset)] for asset in assets} if month in pending else None
+        )
+        result = simulate_challenge_for_month(
+            year, month, profile, assets=assets, bundles=bundles, bt_results=bt_results
+        )
         results.append(result)
         
         status = "PASS" if result.both_passed else "FAIL"
@@ -407,16 +687,12 @@ def run_yearly_challenge_analysis(
               f"Days: {result.trading_days}")
     
     passed_months = sum(1 for r in results if r.both_passed)
-    print(f"\n{'='*60}")
-    print(f"SUMMARY: {passed_months}/12 months would pass the challenge")
-    print(f"{'='*60}\n")
+    _write_lines([f"\n{'='*60}", f"SUMMARY: {passed_months}/12 months would pass the challenge", f"{'='*60}\n"])
     
     return results
 
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) >= 3:
         try:
             month = int(sys.argv[1])
@@ -429,7 +705,7 @@ if __name__ == "__main__":
                 print("Year must be between 2020 and 2030")
                 sys.exit(1)
             
-            result = simulate_challenge_for_month(year, month)
+            result = simulate_challenge_for_month(year, month, processes=True)
             print("\n" + format_challenge_result(result))
         except ValueError:
             print("Usage: python challenge_simulator.py <month> <year>")
@@ -437,4 +713,4 @@ if __name__ == "__main__":
             sys.exit(1)
     else:
         current_year = datetime.now().year
-        results = run_yearly_challenge_analysis(current_year)
+        results = run_yearly_challenge_analysis(current_year, processes=True)
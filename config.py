@@ -129,6 +129,13 @@ REMOVED_ASSETS = [
     "XCUUSD", "XCU_USD",
 ]
 
+_REMOVED_NORMALIZED: frozenset[str] = frozenset(r.upper().replace("_", "") for r in REMOVED_ASSETS)
+
+ALL_MARKET_INSTRUMENTS: tuple[str, ...] = tuple(sorted(set(
+    FOREX_PAIRS + METALS + INDICES + ENERGIES + CRYPTO_ASSETS
+)))
+ALL_MARKET_INSTRUMENTS_SET = frozenset(ALL_MARKET_INSTRUMENTS)
+
 
 def validate_asset_not_removed(asset: str) -> bool:
     """
@@ -139,18 +146,12 @@ def validate_asset_not_removed(asset: str) -> bool:
     
     Returns True if asset is valid (not removed), False otherwise.
     """
-    normalized = asset.upper().replace("_", "")
-    for removed in REMOVED_ASSETS:
-        if normalized == removed.replace("_", ""):
-            return False
-    return True
+    return asset.upper().replace("_", "") not in _REMOVED_NORMALIZED
 
 
 def all_market_instruments() -> list[str]:
     """All instruments Blueprint can scan."""
-    return sorted(set(
-        FOREX_PAIRS + METALS + INDICES + ENERGIES + CRYPTO_ASSETS
-    ))
+    return list(ALL_MARKET_INSTRUMENTS)
 
 
 def get_profile_info() -> str:
@@ -7,7 +7,10 @@ to reduce latency and API calls.
 
 import datetime as dt
 import os
-from typing import List, Dict, Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import List, Dict, Any, Optional, Tuple
 
 import requests
 
@@ -15,11 +18,54 @@ from config import OANDA_API_URL, GRANULARITY_MAP
 from cache import get_cache
 
 
+# One pooled HTTP session for all OANDA calls, so scans running on worker
+# threads reuse connections instead of opening a new TLS connection per request
+HTTP_POOL_SIZE = 32
+_session: Optional[requests.Session] = None
+_session_lock = Lock()
+
+# Live prices are reused for a few seconds so overlapping commands and the
+# autoscan share one pricing request
+PRICE_CACHE_TTL_SECONDS = 3.0
+_price_cache: Dict[str, Tuple[float, Dict[str, float]]] = {}
+_price_cache_lock = Lock()
+
+
+def _reset_session_after_fork() -> None:
+    """
+    Drop the parent's session in a forked child so they never share sockets.
+    
+    The locks are recreated too, since another parent thread may have held
+    them at fork time.
+    """
+    global _session, _session_lock, _price_cache_lock
+    _session = None
+    _session_lock = Lock()
+    _price_cache_lock = Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_session_after_fork)
+
+
 def _get_api_key() -> str:
     """Get OANDA API key from environment."""
     return os.getenv("OANDA_API_KEY", "").strip()
 
 
+def _http_session() -> requests.Session:
+    """Get the shared HTTP session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
 def _oanda_headers() -> Optional[Dict[str, str]]:
     """Get OANDA API headers, or None if API key not configured."""
     api_key = _get_api_key()
@@ -69,7 +115,7 @@ def get_ohlcv(
     }
 
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=15)
+        resp = _http_session().get(url, headers=headers, params=params, timeout=15)
     except requests.exceptions.RequestException as e:
         print(f"[data.get_ohlcv] Network error for {instrument}, {timeframe}: {e}")
         return []
@@ -104,6 +150,30 @@ def get_ohlcv(
     return candles
 
 
+def get_ohlcv_batch(
+    instruments: List[str],
+    timeframe: str = "D",
+    count: int = 200,
+    use_cache: bool = True,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch OHLCV candles for several instruments, one request per unique instrument.
+    
+    OANDA has no multi-instrument candles endpoint, so the requests are run
+    concurrently over the shared session.
+    
+    Returns:
+        Dict mapping each instrument to its candles (empty list on failure)
+    """
+    unique = list(dict.fromkeys(instruments))
+    if len(unique) <= 1:
+        return {instrument: get_ohlcv(instrument, timeframe, count, use_cache) for instrument in unique}
+    
+    with ThreadPoolExecutor(max_workers=min(len(unique), HTTP_POOL_SIZE)) as pool:
+        results = pool.map(lambda instrument: get_ohlcv(instrument, timeframe, count, use_cache), unique)
+        return dict(zip(unique, results))
+
+
 def get_cache_stats() -> Dict[str, Any]:
     """Get statistics about the data cache."""
     return get_cache().get_stats()
@@ -144,7 +214,7 @@ def get_current_prices(instruments: List[str]) -> Dict[str, Dict[str, float]]:
     params = {"instruments": instruments_str}
     
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
+        resp = _http_session().get(url, headers=headers, params=params, timeout=10)
     except requests.exceptions.RequestException as e:
         print(f"[data.get_current_prices] Network error: {e}")
         return {}
@@ -168,6 +238,37 @@ def get_current_prices(instruments: List[str]) -> Dict[str, Dict[str, float]]:
     return result
 
 
+def get_current_prices_cached(
+    instruments: List[str],
+    ttl: float = PRICE_CACHE_TTL_SECONDS,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Like get_current_prices, but reuse prices fetched within the last `ttl` seconds.
+    
+    Only missing or stale instruments are requested, in a single batch.
+    """
+    result: Dict[str, Dict[str, float]] = {}
+    missing: List[str] = []
+    now = time.monotonic()
+    with _price_cache_lock:
+        for instrument in dict.fromkeys(instruments):
+            hit = _price_cache.get(instrument)
+            if hit is not None and now - hit[0] < ttl:
+                result[instrument] = hit[1]
+            else:
+                missing.append(instrument)
+    
+    if missing:
+        fetched = get_current_prices(missing)
+        fetched_at = time.monotonic()
+        with _price_cache_lock:
+            for instrument, price in fetched.items():
+                _price_cache[instrument] = (fetched_at, price)
+        result.update(fetched)
+    
+    return result
+
+
 def _get_account_id() -> str:
     """Get OANDA account ID from environment."""
     import os
@@ -8,14 +8,22 @@ Provides clean, professional Discord embeds for:
 - Trade closes
 - Phase progress
 
+Embeds posted by the bot go through a throttled send queue (enqueue_embed)
+so bursts of trade events stay under Discord's per-channel rate limit and
+share messages (up to 10 embeds each).
+
 Uses active account profile for all sizing and display.
 Default: The5ers High Stakes 10K
 """
 
+import asyncio
 import discord
 import hashlib
-from datetime import datetime
-from typing import Optional, List
+import struct
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Optional, List, Tuple
 
 from config import ACCOUNT_SIZE, RISK_PER_TRADE_PCT, ACTIVE_ACCOUNT_PROFILE
 from position_sizing import (
@@ -33,17 +41,54 @@ COLOR_SUCCESS = 0x00E676
 COLOR_WARNING = 0xFFAB00
 COLOR_ERROR = 0xF44336
 
+_pack_time_fields = struct.Struct("<HBBBBBI").pack
+
 
 def generate_trade_id(symbol: str, direction: str, timestamp: Optional[datetime] = None) -> str:
     """Generate a short unique trade ID."""
-    ts = timestamp or datetime.utcnow()
-    data = f"{symbol}_{direction}_{ts.isoformat()}"
-    return hashlib.md5(data.encode()).hexdigest()[:8].upper()
+    ts = timestamp or datetime.now(timezone.utc)
+    # 8 hex chars only need a 4-byte digest; feed the parts instead of
+    # formatting an intermediate string, and pack the time fields rather
+    # than rendering them with isoformat()
+    h = hashlib.blake2b(digest_size=4)
+    h.update(symbol.encode())
+    h.update(b"_")
+    h.update(direction.encode())
+    h.update(b"_")
+    h.update(_pack_time_fields(ts.year, ts.month, ts.day, ts.hour, ts.minute, ts.second, ts.microsecond))
+    return h.hexdigest().upper()
+
+
+def _fmt_utc(dt: datetime) -> str:
+    """Format as "YYYY-MM-DD HH:MM UTC" without going through strftime."""
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d} UTC"
+
+
+# The active profile is fixed at import, so the footer text and loss
+# limits (as percentages) are too
+_PROFILE_FOOTER = f"Blueprint Trader AI | {ACTIVE_ACCOUNT_PROFILE.display_name} | {RISK_PER_TRADE_PCT:.1%} risk"
+_MAX_DAILY_LOSS_PCT = ACTIVE_ACCOUNT_PROFILE.max_daily_loss_pct * 100
+_MAX_TOTAL_LOSS_PCT = ACTIVE_ACCOUNT_PROFILE.max_total_loss_pct * 100
+
+
+@lru_cache(maxsize=64)
+def _display_symbol(symbol: str) -> str:
+    """OANDA instrument name for display (EUR_USD -> EUR/USD)."""
+    return symbol.replace("_", "/")
+
+
+@lru_cache(maxsize=8)
+def _direction_meta(direction: str) -> Tuple[bool, str, str]:
+    """Return (is_long, "LONG"/"SHORT", colour emoji) for a direction."""
+    is_long = direction.lower() == "bullish"
+    if is_long:
+        return True, "LONG", "🟢"
+    return False, "SHORT", "🔴"
 
 
 def get_profile_footer() -> str:
     """Get footer text showing active profile."""
-    return f"Blueprint Trader AI | {ACTIVE_ACCOUNT_PROFILE.display_name} | {RISK_PER_TRADE_PCT*100:.1f}% risk"
+    return _PROFILE_FOOTER
 
 
 def create_setup_embed(
@@ -52,14 +97,14 @@ def create_setup_embed(
     timeframe: str,
     entry: float,
     stop_loss: float,
-    tp1: float = None,
-    tp2: float = None,
-    tp3: float = None,
+    tp1: Optional[float] = None,
+    tp2: Optional[float] = None,
+    tp3: Optional[float] = None,
     confluence_score: int = 0,
-    confluence_items: List[str] = None,
-    description: str = None,
-    account_size: float = None,
-    risk_pct: float = None,
+    confluence_items: Optional[List[str]] = None,
+    description: Optional[str] = None,
+    account_size: Optional[float] = None,
+    risk_pct: Optional[float] = None,
     entry_datetime: Optional[datetime] = None,
 ) -> discord.Embed:
     """
@@ -86,21 +131,22 @@ def create_setup_embed(
     if risk_pct is None:
         risk_pct = RISK_PER_TRADE_PCT
     
-    is_long = direction.lower() == "bullish"
-    emoji = "🟢" if is_long else "🔴"
-    dir_text = "LONG" if is_long else "SHORT"
+    is_long, dir_text, emoji = _direction_meta(direction)
     color = COLOR_LONG if is_long else COLOR_SHORT
     
-    display_symbol = symbol.replace("_", "/")
+    display_symbol = _display_symbol(symbol)
     title = f"{emoji} {display_symbol} {dir_text} ({timeframe})"
     
     desc = description or f"Trade setup identified with {confluence_score}/7 confluence."
     
+    # One timestamp for the embed, the entry date text and the trade ID
+    entry_time = entry_datetime or datetime.now(timezone.utc)
+    
     embed = discord.Embed(
         title=title,
         description=desc,
         color=color,
-        timestamp=entry_datetime or datetime.utcnow()
+        timestamp=entry_time
     )
     
     sizing = calculate_position_size_5ers(
@@ -122,16 +168,19 @@ def create_setup_embed(
     
     stop_pips = sizing.get("stop_pips", 0)
     
-    entry_date_str = (entry_datetime or datetime.utcnow()).strftime("%Y-%m-%d %H:%M UTC")
-    levels_text = f"**Entry Date:** {entry_date_str}\n"
-    levels_text += f"**Entry:** {entry:.5f}\n"
-    levels_text += f"**Stoploss:** {stop_loss:.5f}  ({stop_pips:.1f} pips)\n"
+    entry_date_str = _fmt_utc(entry_time)
+    levels = [
+        f"**Entry Date:** {entry_date_str}",
+        f"**Entry:** {entry:.5f}",
+        f"**Stoploss:** {stop_loss:.5f}  ({stop_pips:.1f} pips)",
+    ]
     if tp1:
-        levels_text += f"**TP1:** {tp1:.5f}  ({rr_values['tp1_rr']:.2f}R)\n"
+        levels.append(f"**TP1:** {tp1:.5f}  ({rr_values['tp1_rr']:.2f}R)")
     if tp2:
-        levels_text += f"**TP2:** {tp2:.5f}  ({rr_values['tp2_rr']:.2f}R)\n"
+        levels.append(f"**TP2:** {tp2:.5f}  ({rr_values['tp2_rr']:.2f}R)")
     if tp3:
-        levels_text += f"**TP3:** {tp3:.5f}  ({rr_values['tp3_rr']:.2f}R)"
+        levels.append(f"**TP3:** {tp3:.5f}  ({rr_values['tp3_rr']:.2f}R)")
+    levels_text = "\n".join(levels)
     
     embed.add_field(
         name="Entry & Levels",
@@ -139,9 +188,11 @@ def create_setup_embed(
         inline=False
     )
     
-    risk_text = f"**Account:** ${account_size:,.0f} ({ACTIVE_ACCOUNT_PROFILE.display_name})\n"
-    risk_text += f"**Risk:** {sizing['risk_pct']*100:.2f}%  |  ${sizing['risk_usd']:,.0f}\n"
-    risk_text += f"**Lot size:** {sizing['lot_size']:.2f} lots"
+    risk_text = (
+        f"**Account:** ${account_size:,.0f} ({ACTIVE_ACCOUNT_PROFILE.display_name})\n"
+        f"**Risk:** {sizing['risk_pct']:.2%}  |  ${sizing['risk_usd']:,.0f}\n"
+        f"**Lot size:** {sizing['lot_size']:.2f} lots"
+    )
     
     embed.add_field(
         name="Risk & Position Size",
@@ -149,15 +200,15 @@ def create_setup_embed(
         inline=False
     )
     
-    if confluence_items and len(confluence_items) > 0:
-        conf_text = "\n".join([f"• {item}" for item in confluence_items[:5]])
+    if confluence_items:
+        conf_text = "• " + "\n• ".join(confluence_items[:5])
         embed.add_field(
             name=f"Confluence ({confluence_score}/7)",
             value=conf_text,
             inline=False
         )
     
-    trade_id = generate_trade_id(symbol, direction)
+    trade_id = generate_trade_id(symbol, direction, entry_time)
     embed.set_footer(text=f"{get_profile_footer()} | ID: {trade_id}")
     
     return embed
@@ -171,40 +222,38 @@ def create_activation_embed(
     lot_size: float,
     risk_usd: float,
     risk_pct: float,
-    trade_id: str = None,
+    trade_id: Optional[str] = None,
     entry_datetime: Optional[datetime] = None,
 ) -> discord.Embed:
     """Create embed for trade activation (order filled)."""
-    is_long = direction.lower() == "bullish"
-    emoji = "🟢" if is_long else "🔴"
-    dir_text = "LONG" if is_long else "SHORT"
+    _, dir_text, _ = _direction_meta(direction)
     
-    display_symbol = symbol.replace("_", "/")
+    display_symbol = _display_symbol(symbol)
     title = f"✅ Trade Activated - {display_symbol} {dir_text}"
-    
-    embed = discord.Embed(
-        title=title,
-        color=COLOR_SUCCESS,
-        timestamp=entry_datetime or datetime.utcnow()
-    )
-    
-    entry_date_str = (entry_datetime or datetime.utcnow()).strftime("%Y-%m-%d %H:%M UTC")
-    embed.add_field(name="Entry Date", value=entry_date_str, inline=True)
-    embed.add_field(name="Entry", value=f"{entry:.5f}", inline=True)
-    embed.add_field(name="Stop Loss", value=f"{stop_loss:.5f}", inline=True)
-    
-    embed.add_field(
-        name="Risk",
-        value=f"${risk_usd:,.0f} ({risk_pct*100:.2f}%)",
-        inline=True
-    )
-    embed.add_field(name="Lot Size", value=f"{lot_size:.2f}", inline=True)
-    embed.add_field(name="\u200b", value="\u200b", inline=True)
+    entry_time = entry_datetime or datetime.now(timezone.utc)
     
     footer_text = get_profile_footer()
     if trade_id:
         footer_text += f" | ID: {trade_id}"
-    embed.set_footer(text=footer_text)
+    
+    # Fixed layout, so build the payload in one go rather than through
+    # add_field/set_footer. The timestamp is still set through the property
+    # so naive datetimes are handled as before.
+    embed = discord.Embed.from_dict({
+        "title": title,
+        "color": COLOR_SUCCESS,
+        "fields": [{
+            "name": "Trade",
+            "value": (
+                f"**Entry Date:** {_fmt_utc(entry_time)}\n"
+                f"**Entry:** {entry:.5f}  |  **Stop Loss:** {stop_loss:.5f}\n"
+                f"**Risk:** ${risk_usd:,.0f} ({risk_pct:.2%})  |  **Lot Size:** {lot_size:.2f}"
+            ),
+            "inline": False,
+        }],
+        "footer": {"text": footer_text},
+    })
+    embed.timestamp = entry_time
     
     return embed
 
@@ -218,53 +267,36 @@ def create_tp_hit_embed(
     realized_pct: float,
     realized_r: float,
     remaining_pct: float = 100.0,
-    remaining_lots: float = None,
-    current_sl: float = None,
+    remaining_lots: Optional[float] = None,
+    current_sl: Optional[float] = None,
     moved_to_be: bool = False,
     entry_datetime: Optional[datetime] = None,
 ) -> discord.Embed:
     """Create embed for take profit hit."""
-    display_symbol = symbol.replace("_", "/")
-    is_long = direction.lower() == "bullish"
-    dir_text = "LONG" if is_long else "SHORT"
+    display_symbol = _display_symbol(symbol)
+    _, dir_text, _ = _direction_meta(direction)
     
     title = f"🎯 TP{tp_level} Hit - {display_symbol} {dir_text}"
     
     embed = discord.Embed(
         title=title,
         color=COLOR_SUCCESS,
-        timestamp=datetime.utcnow()
+        timestamp=datetime.now(timezone.utc)
     )
     
+    rows = []
     if entry_datetime:
-        entry_date_str = entry_datetime.strftime("%Y-%m-%d %H:%M UTC")
-        embed.add_field(name="Entry Date", value=entry_date_str, inline=True)
-    
-    embed.add_field(name=f"TP{tp_level}", value=f"{tp_price:.5f}", inline=True)
-    
-    profit_text = f"+${realized_usd:,.0f}  (+{realized_pct:.2f}%, +{realized_r:.2f}R)"
-    embed.add_field(name="Realized", value=profit_text, inline=True)
-    
+        rows.append(f"**Entry Date:** {_fmt_utc(entry_datetime)}")
+    rows.append(f"**TP{tp_level}:** {tp_price:.5f}")
+    rows.append(f"**Realized:** +${realized_usd:,.0f}  (+{realized_pct:.2f}%, +{realized_r:.2f}R)")
     if remaining_pct < 100:
-        embed.add_field(
-            name="Remaining",
-            value=f"{remaining_pct:.0f}% position",
-            inline=True
-        )
-    
+        rows.append(f"**Remaining:** {remaining_pct:.0f}% position")
     if moved_to_be and current_sl:
-        embed.add_field(
-            name="Stop Loss",
-            value=f"Moved to BE ({current_sl:.5f})",
-            inline=True
-        )
-    
+        rows.append(f"**Stop Loss:** Moved to BE ({current_sl:.5f})")
     if remaining_lots is not None:
-        embed.add_field(
-            name="Lots Remaining",
-            value=f"{remaining_lots:.2f}",
-            inline=True
-        )
+        rows.append(f"**Lots Remaining:** {remaining_lots:.2f}")
+    
+    embed.add_field(name="Trade", value="\n".join(rows), inline=False)
     
     embed.set_footer(text=get_profile_footer())
     
@@ -278,34 +310,32 @@ def create_sl_hit_embed(
     result_usd: float,
     result_pct: float,
     result_r: float,
-    daily_pnl_usd: float = None,
-    daily_pnl_pct: float = None,
+    daily_pnl_usd: Optional[float] = None,
+    daily_pnl_pct: Optional[float] = None,
     entry_datetime: Optional[datetime] = None,
 ) -> discord.Embed:
     """Create embed for stop loss hit."""
-    display_symbol = symbol.replace("_", "/")
-    is_long = direction.lower() == "bullish"
-    dir_text = "LONG" if is_long else "SHORT"
+    display_symbol = _display_symbol(symbol)
+    _, dir_text, _ = _direction_meta(direction)
     
     title = f"🛑 Stoploss Hit - {display_symbol} {dir_text}"
     
     embed = discord.Embed(
         title=title,
         color=COLOR_ERROR,
-        timestamp=datetime.utcnow()
+        timestamp=datetime.now(timezone.utc)
     )
     
+    rows = []
     if entry_datetime:
-        entry_date_str = entry_datetime.strftime("%Y-%m-%d %H:%M UTC")
-        embed.add_field(name="Entry Date", value=entry_date_str, inline=True)
-    
-    embed.add_field(name="SL", value=f"{sl_price:.5f}", inline=True)
+        rows.append(f"**Entry Date:** {_fmt_utc(entry_datetime)}")
+    rows.append(f"**SL:** {sl_price:.5f}")
+    rows.append(f"**Result:** ${result_usd:,.0f}  ({result_pct:.2f}%, {result_r:.2f}R)")
     
-    result_text = f"${result_usd:,.0f}  ({result_pct:.2f}%, {result_r:.2f}R)"
-    embed.add_field(name="Result", value=result_text, inline=True)
+    embed.add_field(name="Trade", value="\n".join(rows), inline=False)
     
     if daily_pnl_usd is not None:
-        max_daily_loss = ACTIVE_ACCOUNT_PROFILE.max_daily_loss_pct * 100
+        max_daily_loss = _MAX_DAILY_LOSS_PCT
         daily_text = f"${daily_pnl_usd:,.0f}  ({daily_pnl_pct:.2f}%)"
         status = "Within limits" if abs(daily_pnl_pct) < max_daily_loss else f"Near {max_daily_loss:.0f}% limit"
         embed.add_field(
@@ -327,14 +357,13 @@ def create_trade_closed_embed(
     total_result_pct: float,
     total_result_r: float,
     exit_reason: str = "Manual",
-    daily_pnl_usd: float = None,
-    daily_pnl_pct: float = None,
+    daily_pnl_usd: Optional[float] = None,
+    daily_pnl_pct: Optional[float] = None,
     entry_datetime: Optional[datetime] = None,
 ) -> discord.Embed:
     """Create embed for trade closed."""
-    display_symbol = symbol.replace("_", "/")
-    is_long = direction.lower() == "bullish"
-    dir_text = "LONG" if is_long else "SHORT"
+    display_symbol = _display_symbol(symbol)
+    _, dir_text, _ = _direction_meta(direction)
     
     is_winner = total_result_usd > 0
     emoji = "✅" if is_winner else "❌"
@@ -345,15 +374,16 @@ def create_trade_closed_embed(
     embed = discord.Embed(
         title=title,
         color=color,
-        timestamp=datetime.utcnow()
+        timestamp=datetime.now(timezone.utc)
     )
     
+    rows = []
     if entry_datetime:
-        entry_date_str = entry_datetime.strftime("%Y-%m-%d %H:%M UTC")
-        embed.add_field(name="Entry Date", value=entry_date_str, inline=True)
+        rows.append(f"**Entry Date:** {_fmt_utc(entry_datetime)}")
+    rows.append(f"**Exit Price:** {avg_exit:.5f}")
+    rows.append(f"**Exit Reason:** {exit_reason}")
     
-    embed.add_field(name="Exit Price", value=f"{avg_exit:.5f}", inline=True)
-    embed.add_field(name="Exit Reason", value=exit_reason, inline=True)
+    embed.add_field(name="Trade", value="\n".join(rows), inline=False)
     
     sign = "+" if total_result_usd >= 0 else ""
     result_text = f"{sign}${total_result_usd:,.0f}  ({sign}{total_result_pct:.2f}%, {sign}{total_result_r:.2f}R)"
@@ -382,14 +412,14 @@ def create_backtest_embed(
     tp3_hits: int,
     sl_hits: int,
     avg_rr: float = 0.0,
-    account_size: float = None,
-    phase1_simulation: dict = None,
+    account_size: Optional[float] = None,
+    phase1_simulation: Optional[dict] = None,
 ) -> discord.Embed:
     """Create embed for backtest results with challenge simulation."""
     if account_size is None:
         account_size = ACCOUNT_SIZE
     
-    display_asset = asset.replace("_", "/")
+    display_asset = _display_symbol(asset)
     
     is_profitable = total_profit_usd > 0
     color = COLOR_SUCCESS if is_profitable else COLOR_ERROR
@@ -401,32 +431,38 @@ def create_backtest_embed(
         title=title,
         description=f"Period: {period} | Account: ${account_size:,.0f} ({ACTIVE_ACCOUNT_PROFILE.display_name})",
         color=color,
-        timestamp=datetime.utcnow()
+        timestamp=datetime.now(timezone.utc)
     )
     
     wr_emoji = "🎯" if win_rate >= 70 else "📊" if win_rate >= 50 else "⚠️"
     
     sign = "+" if total_profit_usd >= 0 else ""
-    perf_text = f"{profit_emoji} **Total Profit:** {sign}${total_profit_usd:,.0f} ({sign}{total_profit_pct:.1f}%)\n"
-    perf_text += f"{wr_emoji} **Win Rate:** {win_rate:.1f}%\n"
-    perf_text += f"📉 **Max Drawdown:** {max_drawdown_pct:.1f}%\n"
-    perf_text += f"📈 **Avg R/Trade:** {avg_rr:.2f}R"
+    perf_text = (
+        f"{profit_emoji} **Total Profit:** {sign}${total_profit_usd:,.0f} ({sign}{total_profit_pct:.1f}%)\n"
+        f"{wr_emoji} **Win Rate:** {win_rate:.1f}%\n"
+        f"📉 **Max Drawdown:** {max_drawdown_pct:.1f}%\n"
+        f"📈 **Avg R/Trade:** {avg_rr:.2f}R"
+    )
     
     embed.add_field(name="Performance", value=perf_text, inline=False)
     
     tp1_trail = tp1_hits
-    exit_text = f"**Trades:** {total_trades}\n"
-    exit_text += f"TP1+Trail: {tp1_trail} | TP2: {tp2_hits} | TP3: {tp3_hits}\n"
-    exit_text += f"SL: {sl_hits}"
+    exit_text = (
+        f"**Trades:** {total_trades}\n"
+        f"TP1+Trail: {tp1_trail} | TP2: {tp2_hits} | TP3: {tp3_hits}\n"
+        f"SL: {sl_hits}"
+    )
     
     embed.add_field(name="Exit Breakdown", value=exit_text, inline=False)
     
     if phase1_simulation:
         phase_emoji = "✅" if phase1_simulation.get("passed") else "❌"
-        phase_text = f"{phase_emoji} **Phase 1 ({phase1_simulation.get('target_pnl_pct', 8):.0f}% target):**\n"
-        phase_text += f"{phase1_simulation.get('reason', 'Unknown')}\n"
-        phase_text += f"Profitable days: {phase1_simulation.get('profitable_days', 0)}/{phase1_simulation.get('min_profitable_days', 3)}\n"
-        phase_text += f"Daily violations: {phase1_simulation.get('daily_loss_violations', 0)} | Total violations: {phase1_simulation.get('total_loss_violations', 0)}"
+        phase_text = (
+            f"{phase_emoji} **Phase 1 ({phase1_simulation.get('target_pnl_pct', 8):.0f}% target):**\n"
+            f"{phase1_simulation.get('reason', 'Unknown')}\n"
+            f"Profitable days: {phase1_simulation.get('profitable_days', 0)}/{phase1_simulation.get('min_profitable_days', 3)}\n"
+            f"Daily violations: {phase1_simulation.get('daily_loss_violations', 0)} | Total violations: {phase1_simulation.get('total_loss_violations', 0)}"
+        )
         
         embed.add_field(name="Challenge Simulation", value=phase_text, inline=False)
     
@@ -437,7 +473,7 @@ def create_backtest_embed(
 
 def create_phase_progress_embed(
     phase_progress: dict,
-    risk_summary: dict = None,
+    risk_summary: Optional[dict] = None,
 ) -> discord.Embed:
     """Create embed showing current phase progress."""
     phase_name = phase_progress.get("phase_name", "Phase 1")
@@ -454,30 +490,30 @@ def create_phase_progress_embed(
     embed = discord.Embed(
         title=title,
         color=color,
-        timestamp=datetime.utcnow()
+        timestamp=datetime.now(timezone.utc)
     )
     
     progress_bar = _create_progress_bar(progress)
-    progress_text = f"{progress_bar}\n"
-    progress_text += f"**Current:** {current_pct:+.2f}% | **Target:** {target_pct:.0f}%"
+    progress_text = f"{progress_bar}\n**Current:** {current_pct:+.2f}% | **Target:** {target_pct:.0f}%"
     
     embed.add_field(name="Profit Progress", value=progress_text, inline=False)
     
     days_bar = _create_progress_bar((profitable_days / min_days) * 100 if min_days > 0 else 0)
-    days_text = f"{days_bar}\n"
-    days_text += f"**Profitable Days:** {profitable_days}/{min_days}"
+    days_text = f"{days_bar}\n**Profitable Days:** {profitable_days}/{min_days}"
     
     embed.add_field(name="Trading Days", value=days_text, inline=False)
     
     if risk_summary:
         daily_pnl = risk_summary.get("daily_pnl_pct", 0)
         total_dd = risk_summary.get("total_drawdown_pct", 0)
-        max_daily = ACTIVE_ACCOUNT_PROFILE.max_daily_loss_pct * 100
-        max_total = ACTIVE_ACCOUNT_PROFILE.max_total_loss_pct * 100
+        max_daily = _MAX_DAILY_LOSS_PCT
+        max_total = _MAX_TOTAL_LOSS_PCT
         
-        risk_text = f"**Daily P/L:** {daily_pnl:+.2f}% (limit: -{max_daily:.0f}%)\n"
-        risk_text += f"**Total DD:** {total_dd:.2f}% (limit: {max_total:.0f}%)\n"
-        risk_text += f"**Open Risk:** {risk_summary.get('open_risk_pct', 0):.2f}%"
+        risk_text = (
+            f"**Daily P/L:** {daily_pnl:+.2f}% (limit: -{max_daily:.0f}%)\n"
+            f"**Total DD:** {total_dd:.2f}% (limit: {max_total:.0f}%)\n"
+            f"**Open Risk:** {risk_summary.get('open_risk_pct', 0):.2f}%"
+        )
         
         embed.add_field(name="Risk Status", value=risk_text, inline=False)
     
@@ -486,10 +522,16 @@ def create_phase_progress_embed(
     return embed
 
 
+# Bars for the default length, indexed by filled cell count
+_PROGRESS_BARS = tuple(f"[{'▓' * i}{'░' * (10 - i)}]" for i in range(11))
+
+
 def _create_progress_bar(pct: float, length: int = 10) -> str:
     """Create a text-based progress bar."""
     filled = int((pct / 100) * length)
     filled = max(0, min(filled, length))
+    if length == 10:
+        return f"{_PROGRESS_BARS[filled]} {pct:.1f}%"
     empty = length - filled
     return f"[{'▓' * filled}{'░' * empty}] {pct:.1f}%"
 
@@ -498,8 +540,11 @@ def build_confluence_list(scan_result) -> List[str]:
     """Build confluence list from scan result for embed."""
     items = []
     
-    if scan_result.htf_bias and ("alignment" in scan_result.htf_bias.lower() or "reversal" in scan_result.htf_bias.lower()):
-        items.append(f"HTF: {scan_result.htf_bias[:50]}")
+    htf = scan_result.htf_bias
+    if htf:
+        htf_lower = htf.lower()
+        if "alignment" in htf_lower or "reversal" in htf_lower:
+            items.append(f"HTF: {htf[:50]}")
     
     if scan_result.location_note and "score:" in scan_result.location_note:
         items.append(f"S/R: {scan_result.location_note[:50]}")
@@ -516,3 +561,163 @@ def build_confluence_list(scan_result) -> List[str]:
         items.append(f"Structure: {scan_result.structure_note[:50]}")
     
     return items[:5]
+
+
+# Discord allows 5 messages per 5 seconds per channel
+SEND_RATE_LIMIT = 5
+SEND_RATE_WINDOW_SECONDS = 5.0
+SEND_QUEUE_SIZE = 100
+SEND_MAX_ATTEMPTS = 3
+# One message can carry up to 10 embeds; wait briefly to fill a batch
+SEND_BATCH_SIZE = 10
+SEND_BATCH_WAIT_SECONDS = 0.25
+# Discord caps the combined text of all embeds in one message
+SEND_BATCH_MAX_CHARS = 6000
+
+
+class _TokenBucket:
+    """Per-channel token bucket: `capacity` sends per `window` seconds."""
+    
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+    
+    def __init__(self, capacity: int, window: float):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+    
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+_send_queue: Optional[asyncio.Queue] = None
+_send_task: Optional[asyncio.Task] = None
+_send_buckets: Dict[int, _TokenBucket] = {}
+
+
+async def enqueue_embed(channel: discord.abc.Messageable, embed: discord.Embed) -> "asyncio.Future[bool]":
+    """
+    Queue an embed for throttled delivery to a channel.
+    
+    The first call starts a background sender on the running event loop.
+    Waits only if the queue is full (SEND_QUEUE_SIZE pending embeds).
+    Returns a future that resolves to True once the embed is delivered,
+    or False if sending it failed.
+    """
+    global _send_queue, _send_task
+    if _send_queue is None:
+        _send_queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+    if _send_task is None or _send_task.done():
+        _send_task = asyncio.create_task(_send_worker(_send_queue))
+    delivered = asyncio.get_running_loop().create_future()
+    await _send_queue.put((channel, embed, delivered))
+    return delivered
+
+
+async def drain_embed_queue() -> None:
+    """Wait until every queued embed has been sent (or given up on)."""
+    if _send_queue is not None:
+        await _send_queue.join()
+
+
+def _resolve(delivered: "asyncio.Future[bool]", ok: bool) -> None:
+    """Settle a delivery future unless it already has a result."""
+    if not delivered.done():
+        delivered.set_result(ok)
+
+
+async def _send_worker(queue: asyncio.Queue) -> None:
+    """
+    Deliver queued embeds, respecting the channel buckets.
+    
+    Consecutive embeds for the same channel are sent together, up to
+    SEND_BATCH_SIZE per message and SEND_BATCH_MAX_CHARS of embed text;
+    a lone embed waits at most SEND_BATCH_WAIT_SECONDS for company. If a
+    batch is rejected for anything other than a rate limit, its embeds
+    are retried one per message so one bad embed doesn't sink the rest.
+    Each embed's delivery future is resolved with the outcome.
+    """
+    loop = asyncio.get_running_loop()
+    held: Optional[Tuple[discord.abc.Messageable, discord.Embed, asyncio.Future]] = None
+    while True:
+        if held is not None:
+            channel, embed, delivered = held
+            held = None
+        else:
+            channel, embed, delivered = await queue.get()
+        batch = [embed]
+        futures = [delivered]
+        batch_chars = len(embed)
+        deadline = loop.time() + SEND_BATCH_WAIT_SECONDS
+        while len(batch) < SEND_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            item_chars = len(item[1])
+            if item[0] is not channel or batch_chars + item_chars > SEND_BATCH_MAX_CHARS:
+                held = item
+                break
+            batch.append(item[1])
+            futures.append(item[2])
+            batch_chars += item_chars
+        try:
+            await _send_throttled(channel, batch)
+            for delivered in futures:
+                _resolve(delivered, True)
+        except Exception as e:
+            rate_limited = isinstance(e, discord.HTTPException) and e.status == 429
+            if len(batch) == 1 or rate_limited:
+                print(f"[discord_output] Failed to send {len(batch)} embed(s): {e}")
+            else:
+                print(f"[discord_output] Batch of {len(batch)} embeds rejected ({e}), sending singly")
+                for single, delivered in zip(batch, futures):
+                    try:
+                        await _send_throttled(channel, [single])
+                        _resolve(delivered, True)
+                    except Exception as e:
+                        print(f"[discord_output] Failed to send embed: {e}")
+        finally:
+            for delivered in futures:
+                _resolve(delivered, False)
+                queue.task_done()
+
+
+async def _send_throttled(channel: discord.abc.Messageable, embeds: List[discord.Embed]) -> None:
+    """Send embeds as one message, waiting for a bucket token and retrying on HTTP 429."""
+    channel_id = getattr(channel, "id", 0)
+    bucket = _send_buckets.get(channel_id)
+    if bucket is None:
+        bucket = _send_buckets[channel_id] = _TokenBucket(SEND_RATE_LIMIT, SEND_RATE_WINDOW_SECONDS)
+    
+    for attempt in range(1, SEND_MAX_ATTEMPTS + 1):
+        await bucket.acquire()
+        try:
+            await channel.send(embeds=embeds)
+            return
+        except discord.HTTPException as e:
+            if e.status != 429 or attempt == SEND_MAX_ATTEMPTS:
+                raise
+            retry_after = _retry_after_seconds(e)
+            print(f"[discord_output] Rate limited, retrying in {retry_after:.1f}s")
+            await asyncio.sleep(retry_after + 1)
+
+
+def _retry_after_seconds(error: discord.HTTPException) -> float:
+    """Retry-After from a 429 response, defaulting to one rate window."""
+    headers = getattr(error.response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", SEND_RATE_WINDOW_SECONDS))
+    except (TypeError, ValueError):
+        return SEND_RATE_WINDOW_SECONDS
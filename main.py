@@ -1,9 +1,12 @@
 import asyncio
 import calendar
+import time
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
-from datetime import datetime
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 
 import os
 
@@ -25,12 +28,6 @@ from config import (
 
 from strategy import (
     scan_single_asset,
-    scan_forex,
-    scan_crypto,
-    scan_metals,
-    scan_indices,
-    scan_energies,
-    scan_all_markets,
     ScanResult,
 )
 
@@ -47,23 +44,80 @@ from discord_output import (
     create_sl_hit_embed,
     create_trade_closed_embed,
     build_confluence_list,
+    enqueue_embed,
+    drain_embed_queue,
 )
 
 from position_sizing import calculate_position_size_5ers
 from config import ACCOUNT_SIZE, RISK_PER_TRADE_PCT
 
 from backtest import run_backtest
-from data import get_ohlcv, get_cache_stats, clear_cache, get_current_prices
+from data import get_ohlcv, get_cache_stats, clear_cache, get_current_prices_cached
 from risk_manager import get_risk_manager, RiskCheckResult, TradeRecord
 from discord_output import create_phase_progress_embed
 from trade_state import get_trade_state
 from challenge_simulator import simulate_challenge_for_month, format_challenge_result
 
 
-ACTIVE_TRADES: dict[str, ScanResult] = {}
-TRADE_PROGRESS: dict[str, dict[str, bool]] = {}
-TRADE_SIZING: dict[str, dict] = {}
-TRADE_ENTRY_DATES: dict[str, object] = {}  # Track entry datetime for each trade
+# TradeSlot.progress bits: TPn hit is bit n-1, SL hit is PROGRESS_SL
+PROGRESS_SL = 0x80
+
+
+@dataclass(slots=True)
+class TradeSlot:
+    """Everything tracked for one active trade, keyed by "SYMBOL_direction"."""
+    trade: ScanResult
+    sizing: dict
+    entry_dt: datetime
+    progress: int = 0
+    # Derived once from the trade so check_trade_updates doesn't rebuild them every tick
+    direction: str = field(init=False)
+    sign: int = field(init=False)  # +1 bullish, -1 bearish
+    risk: float = field(init=False)
+    tp_levels: tuple[tuple[str, int, float, int], ...] = field(init=False)  # (flag, bit, level, tp_num)
+    tp_mask: int = field(init=False)
+    trade_id: str = field(init=False)  # trade_state dedup key for this trade's updates
+
+    def __post_init__(self) -> None:
+        trade = self.trade
+        self.direction = trade.direction.lower()
+        self.sign = 1 if self.direction == "bullish" else -1
+        self.risk = abs(trade.entry - trade.stop_loss) if trade.entry and trade.stop_loss else 1.0
+        self.tp_levels = tuple(
+            (flag, 1 << (tp_num - 1), level, tp_num)
+            for flag, level, tp_num in (("tp1", trade.tp1, 1), ("tp2", trade.tp2, 2), ("tp3", trade.tp3, 3))
+            if level is not None
+        )
+        self.tp_mask = sum(bit for _, bit, _, _ in self.tp_levels)
+        self.trade_id = get_trade_state().generate_trade_id(trade.symbol, self.direction, trade.entry)
+
+
+ACTIVE_TRADES: dict[str, TradeSlot] = {}
+
+# /trade row tag by TradeSlot.sign
+_DIRECTION_TAGS = {1: "[BULL]", -1: "[BEAR]"}
+
+# Max symbols scanned at once by the slash commands (OANDA rate limits)
+SCAN_CONCURRENCY = 8
+
+# Bot channels, resolved once the connection cache is ready (see on_ready)
+_channels: dict[str, discord.abc.Messageable | None] = {}
+
+# The account profile is fixed at import, so its /debug section is too
+_DEBUG_PROFILE_TEXT = (
+    f"**Account Profile:** {ACTIVE_ACCOUNT_PROFILE.display_name}\n"
+    f"  Balance: ${ACTIVE_ACCOUNT_PROFILE.starting_balance:,.0f}\n"
+    f"  Risk/Trade: {ACTIVE_ACCOUNT_PROFILE.risk_per_trade_pct*100:.1f}%\n"
+    f"  Max Daily Loss: {ACTIVE_ACCOUNT_PROFILE.max_daily_loss_pct*100:.0f}%\n"
+    f"  Max Total Loss: {ACTIVE_ACCOUNT_PROFILE.max_total_loss_pct*100:.0f}%\n"
+    f"  Max Concurrent: {ACTIVE_ACCOUNT_PROFILE.max_concurrent_trades} trades\n"
+    f"  Phase 1 Target: {ACTIVE_ACCOUNT_PROFILE.phases[0].profit_target_pct*100:.0f}%\n"
+    f"  Phase 2 Target: {ACTIVE_ACCOUNT_PROFILE.phases[1].profit_target_pct*100:.0f}%\n\n"
+)
+
+# Max concurrent /scan invocations, shared across all users
+SINGLE_SCAN_CONCURRENCY = 4
+_single_scan_semaphore = asyncio.Semaphore(SINGLE_SCAN_CONCURRENCY)
 
 
 def split_message(text: str, limit: int = 1900) -> list[str]:
@@ -72,32 +126,118 @@ def split_message(text: str, limit: int = 1900) -> list[str]:
         return [text]
 
     chunks: list[str] = []
-    current = ""
+    # Collect each chunk's lines and join once, instead of growing a string
+    buf: list[str] = []
+    cur_len = 0
 
     for line in text.split("\n"):
-        if len(current) + len(line) + 1 > limit:
-            if current:
-                chunks.append(current)
-            current = line
+        if cur_len + len(line) + 1 > limit:
+            if cur_len:
+                chunks.append("\n".join(buf))
+            buf = [line]
+            cur_len = len(line)
+        elif cur_len:
+            buf.append(line)
+            cur_len += len(line) + 1
         else:
-            if current:
-                current += "\n" + line
-            else:
-                current = line
+            buf = [line]
+            cur_len = len(line)
 
-    if current:
-        chunks.append(current)
+    if cur_len:
+        chunks.append("\n".join(buf))
 
     return chunks
 
 
-def _ensure_trade_progress(trade_key: str) -> None:
-    """Make sure TRADE_PROGRESS has an entry for this trade key."""
-    if trade_key not in TRADE_PROGRESS:
-        TRADE_PROGRESS[trade_key] = {
-            "tp1": False, "tp2": False, "tp3": False,
-            "tp4": False, "tp5": False, "sl": False,
-        }
+async def scan_group_async(symbols: list[str]) -> tuple[list[ScanResult], list[ScanResult]]:
+    """
+    Async counterpart of strategy.scan_group.
+    
+    Each symbol is scanned on a worker thread so the OANDA requests overlap,
+    with at most SCAN_CONCURRENCY in flight. Results keep the input order.
+    
+    Returns (results, trade_ideas) like scan_group.
+    """
+    semaphore = asyncio.Semaphore(SCAN_CONCURRENCY)
+
+    async def scan_one(symbol: str) -> ScanResult | None:
+        async with semaphore:
+            return await asyncio.to_thread(scan_single_asset, symbol)
+
+    scanned = await asyncio.gather(*(scan_one(sym) for sym in symbols), return_exceptions=True)
+
+    results: list[ScanResult] = []
+    trade_ideas: list[ScanResult] = []
+    for sym, res in zip(symbols, scanned):
+        if isinstance(res, Exception):
+            print(f"[scan_group_async] Error scanning {sym}: {res}")
+            continue
+        if not res:
+            continue
+        results.append(res)
+        if res.status in ("active", "in_progress"):
+            trade_ideas.append(res)
+
+    return results, trade_ideas
+
+
+async def scan_all_markets_async() -> dict[str, tuple[list[ScanResult], list[ScanResult]]]:
+    """
+    Async counterpart of strategy.scan_all_markets.
+    
+    Every group's symbols go through one scan_group_async call, so the whole
+    market shares the SCAN_CONCURRENCY limit instead of scanning group by group.
+    """
+    groups = {
+        "Forex": FOREX_PAIRS,
+        "Metals": METALS,
+        "Indices": INDICES,
+        "Energies": ENERGIES,
+        "Crypto": CRYPTO_ASSETS,
+    }
+    all_symbols = list(dict.fromkeys(sym for symbols in groups.values() for sym in symbols))
+    results, _ = await scan_group_async(all_symbols)
+    by_symbol = {res.symbol: res for res in results}
+
+    markets: dict[str, tuple[list[ScanResult], list[ScanResult]]] = {}
+    for name, symbols in groups.items():
+        group_results = [by_symbol[sym] for sym in symbols if sym in by_symbol]
+        trade_ideas = [res for res in group_results if res.status in ("active", "in_progress")]
+        markets[name] = (group_results, trade_ideas)
+    return markets
+
+
+def _validate_month_year(month: int, year: int) -> str | None:
+    """Return an error message for an out-of-range /pass or /output month, else None."""
+    if not 1 <= month <= 12:
+        return "Invalid month. Please enter a value between 1 and 12."
+    if not 2020 <= year <= 2030:
+        return "Invalid year. Please enter a value between 2020 and 2030."
+    return None
+
+
+# Challenge simulations in flight, keyed by (year, month)
+_challenge_runs: dict[tuple[int, int], asyncio.Task] = {}
+
+
+async def _simulate_month_shared(year: int, month: int):
+    """
+    Run simulate_challenge_for_month off the event loop, sharing the run.
+    
+    /pass and /output calls for the same month while a simulation is running
+    await that run instead of starting another. Finished months are then
+    served from the simulator's disk cache.
+    """
+    key = (year, month)
+    task = _challenge_runs.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            asyncio.to_thread(simulate_challenge_for_month, year, month, retain_trades=True)
+        )
+        _challenge_runs[key] = task
+        task.add_done_callback(lambda _: _challenge_runs.pop(key, None))
+    # Shielded so one caller being cancelled doesn't cancel the others
+    return await asyncio.shield(task)
 
 
 def activate_trade(
@@ -125,7 +265,7 @@ def activate_trade(
         return False, check_message
     
     trade.entry = entry_price
-    entry_time = datetime.utcnow()
+    entry_time = datetime.now(timezone.utc)
     
     trade_record = TradeRecord(
         trade_id=trade_key,
@@ -138,12 +278,9 @@ def activate_trade(
         risk_pct=RISK_PER_TRADE_PCT,
         entry_datetime=entry_time,
     )
-    rm.open_trade(trade_record)
+    rm.open_trade(trade_record, now=entry_time)
     
-    ACTIVE_TRADES[trade_key] = trade
-    TRADE_ENTRY_DATES[trade_key] = entry_time
-    TRADE_SIZING[trade_key] = sizing
-    _ensure_trade_progress(trade_key)
+    ACTIVE_TRADES[trade_key] = TradeSlot(trade=trade, sizing=sizing, entry_dt=entry_time)
     
     warning = f" (Warning: {check_message})" if check_result == RiskCheckResult.WARNING_NEAR_LIMIT else ""
     return True, f"Trade activated. Open risk: ${rm.get_open_risk_usd():.2f}{warning}"
@@ -172,9 +309,6 @@ def close_trade_with_pnl(
     )
     
     ACTIVE_TRADES.pop(trade_key, None)
-    TRADE_PROGRESS.pop(trade_key, None)
-    TRADE_SIZING.pop(trade_key, None)
-    TRADE_ENTRY_DATES.pop(trade_key, None)
     
     if closed_trade:
         return True, f"{reason}. P&L: ${pnl_usd:.2f}, Balance: ${rm.current_balance:.2f}"
@@ -199,25 +333,22 @@ def clear_all_trades() -> tuple[int, str]:
         )
     
     ACTIVE_TRADES.clear()
-    TRADE_PROGRESS.clear()
-    TRADE_SIZING.clear()
-    TRADE_ENTRY_DATES.clear()
     
     return count, f"Cleared {count} trades. Open risk reset to ${rm.get_open_risk_usd():.2f}"
 
 
-def _compute_trade_progress(idea: ScanResult, live_prices: dict = None) -> tuple[float, float]:
-    """Compute (current_price, approx_RR) for a trade idea using live prices."""
-    current_price = None
+def _compute_trade_progress(idea: ScanResult, live_prices: dict | None = None) -> tuple[float, float]:
+    """
+    Compute (current_price, approx_RR) for a trade idea using live prices.
     
-    if live_prices and idea.symbol in live_prices:
-        price_data = live_prices[idea.symbol]
-        current_price = price_data.get("mid", 0) if price_data else 0
+    Pass a batched live_prices dict to avoid a request per idea; only when
+    it is None is the symbol's price fetched here.
+    """
+    if live_prices is None:
+        live_prices = get_current_prices_cached([idea.symbol])
     
-    if not current_price or current_price <= 0:
-        prices = get_current_prices([idea.symbol])
-        if prices and idea.symbol in prices:
-            current_price = prices[idea.symbol].get("mid", 0)
+    price_data = live_prices.get(idea.symbol) if live_prices else None
+    current_price = price_data.get("mid", 0) if price_data else 0
     
     if not current_price or current_price <= 0:
         return float("nan"), float("nan")
@@ -248,15 +379,16 @@ async def check_trade_updates(updates_channel: discord.abc.Messageable) -> None:
         return
 
     trade_state = get_trade_state()
-    trade_keys = list(ACTIVE_TRADES.keys())
+    active = list(ACTIVE_TRADES.items())
     
-    all_symbols = list(set(ACTIVE_TRADES[k].symbol for k in trade_keys if k in ACTIVE_TRADES))
-    live_prices = await asyncio.to_thread(get_current_prices, all_symbols) if all_symbols else {}
+    all_symbols = list({slot.trade.symbol for _, slot in active})
+    live_prices = await asyncio.to_thread(get_current_prices_cached, all_symbols)
 
-    for key in trade_keys:
-        trade = ACTIVE_TRADES.get(key)
-        if trade is None:
+    for key, slot in active:
+        # The awaits below can yield to /cleartrades; skip trades it removed
+        if ACTIVE_TRADES.get(key) is not slot:
             continue
+        trade = slot.trade
 
         live_price_data = live_prices.get(trade.symbol)
         if live_price_data:
@@ -267,29 +399,31 @@ async def check_trade_updates(updates_channel: discord.abc.Messageable) -> None:
         else:
             print(f"[check_trade_updates] {trade.symbol}: Could not fetch live price, skipping update")
             continue
-        _ensure_trade_progress(key)
-        progress = TRADE_PROGRESS[key]
+        progress = slot.progress
+        entry_dt = slot.entry_dt
 
         entry = trade.entry
         sl = trade.stop_loss
-        direction = trade.direction.lower()
+        direction = slot.direction
+        sign = slot.sign
+        risk = slot.risk
+        tp_levels = slot.tp_levels
         
-        sizing = TRADE_SIZING.get(key, {})
+        sizing = slot.sizing
         risk_usd = sizing.get("risk_usd", ACCOUNT_SIZE * RISK_PER_TRADE_PCT)
         lot_size = sizing.get("lot_size", 1.0)
 
         closed = False
         embeds_to_send = []
 
-        trade_id = trade_state.generate_trade_id(trade.symbol, direction, entry)
+        trade_id = slot.trade_id
         
-        if sl is not None and not progress["sl"]:
-            if (direction == "bullish" and price <= sl) or (direction == "bearish" and price >= sl):
-                progress["sl"] = True
+        if sl is not None and not progress & PROGRESS_SL:
+            if sign * (sl - price) >= 0:
+                progress |= PROGRESS_SL
                 closed = True
                 
-                if not trade_state.is_update_posted(trade_id, "sl"):
-                    entry_dt = TRADE_ENTRY_DATES.get(key)
+                if trade_state.check_and_mark_update(trade_id, "sl"):
                     embed = create_sl_hit_embed(
                         symbol=trade.symbol,
                         direction=direction,
@@ -300,35 +434,17 @@ async def check_trade_updates(updates_channel: discord.abc.Messageable) -> None:
                         entry_datetime=entry_dt,
                     )
                     embeds_to_send.append(embed)
-                    trade_state.mark_update_posted(trade_id, "sl")
-
-        tp_levels = [
-            ("TP1", "tp1", trade.tp1, 1),
-            ("TP2", "tp2", trade.tp2, 2),
-            ("TP3", "tp3", trade.tp3, 3),
-        ]
 
-        if not progress["sl"]:
-            risk = abs(entry - sl) if entry and sl else 1.0
-            
-            for label, flag, level, tp_num in tp_levels:
-                if level is None or progress[flag]:
+        if not progress & PROGRESS_SL:
+            for flag, bit, level, tp_num in tp_levels:
+                if progress & bit:
                     continue
 
-                hit = False
-                if direction == "bullish" and price >= level:
-                    hit = True
-                elif direction == "bearish" and price <= level:
-                    hit = True
-                
-                if hit:
-                    progress[flag] = True
+                if sign * (price - level) >= 0:
+                    progress |= bit
                     
-                    if not trade_state.is_update_posted(trade_id, flag):
-                        if direction == "bullish":
-                            rr = (level - entry) / risk if risk > 0 else 0
-                        else:
-                            rr = (entry - level) / risk if risk > 0 else 0
+                    if trade_state.check_and_mark_update(trade_id, flag):
+                        rr = sign * (level - entry) / risk if risk > 0 else 0
                         
                         realized_usd = risk_usd * rr
                         realized_pct = RISK_PER_TRADE_PCT * rr * 100
@@ -336,7 +452,6 @@ async def check_trade_updates(updates_channel: discord.abc.Messageable) -> None:
                         remaining_pct = 100 - (tp_num * 33.3)
                         remaining_lots = lot_size * (remaining_pct / 100)
                         
-                        entry_dt = TRADE_ENTRY_DATES.get(key)
                         embed = create_tp_hit_embed(
                             symbol=trade.symbol,
                             direction=direction,
@@ -352,30 +467,26 @@ async def check_trade_updates(updates_channel: discord.abc.Messageable) -> None:
                             entry_datetime=entry_dt,
                         )
                         embeds_to_send.append(embed)
-                        trade_state.mark_update_posted(trade_id, flag)
 
-        all_tps_hit = all(
-            progress[flag] for label, flag, level, _ in tp_levels if level is not None
-        )
+        slot.progress = progress
+        sl_hit = progress & PROGRESS_SL
+        all_tps_hit = (progress & slot.tp_mask) == slot.tp_mask
 
-        if progress["sl"] or all_tps_hit:
+        if sl_hit or all_tps_hit:
             closed = True
 
         if closed:
-            if progress["sl"]:
+            if sl_hit:
                 pnl_usd = -risk_usd
                 reason = "Stop Loss Hit"
             elif all_tps_hit:
-                risk = abs(entry - sl) if entry and sl else 1.0
                 total_rr = sum(
-                    ((level - entry) / risk if direction == "bullish" else (entry - level) / risk)
-                    for _, _, level, _ in tp_levels if level is not None
+                    sign * (level - entry) / risk for _, _, level, _ in tp_levels
                 ) / 3
                 pnl_usd = risk_usd * total_rr
                 reason = "All TPs Hit"
                 
-                if not trade_state.is_update_posted(trade_id, "closed"):
-                    entry_dt = TRADE_ENTRY_DATES.get(key)
+                if trade_state.check_and_mark_update(trade_id, "closed"):
                     embed = create_trade_closed_embed(
                         symbol=trade.symbol,
                         direction=direction,
@@ -387,7 +498,6 @@ async def check_trade_updates(updates_channel: discord.abc.Messageable) -> None:
                         entry_datetime=entry_dt,
                     )
                     embeds_to_send.append(embed)
-                    trade_state.mark_update_posted(trade_id, "closed")
             else:
                 pnl_usd = 0
                 reason = "Unknown"
@@ -397,7 +507,9 @@ async def check_trade_updates(updates_channel: discord.abc.Messageable) -> None:
                 print(f"[check_trade_updates] {trade.symbol}: {close_msg}")
 
         for embed in embeds_to_send:
-            await updates_channel.send(embed=embed)
+            await enqueue_embed(updates_channel, embed)
+    
+    trade_state.flush()
 
 
 class BlueprintTraderBot(commands.Bot):
@@ -418,6 +530,14 @@ bot = BlueprintTraderBot()
 async def on_ready():
     print(f"Logged in as {bot.user} (ID: {bot.user.id})")
     print("Blueprint Trader AI is online.")
+    for name, channel_id in (
+        ("scan", SCAN_CHANNEL_ID),
+        ("trades", TRADES_CHANNEL_ID),
+        ("updates", TRADE_UPDATES_CHANNEL_ID),
+    ):
+        _channels[name] = bot.get_channel(channel_id)
+        if _channels[name] is None:
+            print(f"[on_ready] ERROR: {name} channel {channel_id} not found. Check the channel IDs in config.")
     if os.getenv("OANDA_API_KEY"):
         if not autoscan_loop.is_running():
             autoscan_loop.start()
@@ -464,7 +584,8 @@ async def scan(interaction: discord.Interaction, asset: str):
     await interaction.response.defer()
     
     try:
-        result = scan_single_asset(asset.upper().replace("/", "_"))
+        async with _single_scan_semaphore:
+            result = await asyncio.to_thread(scan_single_asset, asset.upper().replace("/", "_"))
 
         if not result:
             await interaction.followup.send(f"No data available for **{asset}**. Check the instrument name.")
@@ -496,7 +617,7 @@ async def scan(interaction: discord.Interaction, asset: str):
 async def forex(interaction: discord.Interaction):
     await interaction.response.defer()
     try:
-        scan_results, _ = await asyncio.to_thread(scan_forex)
+        scan_results, _ = await scan_group_async(FOREX_PAIRS)
 
         if not scan_results:
             await interaction.followup.send("**Forex** - No setups found.")
@@ -516,7 +637,7 @@ async def forex(interaction: discord.Interaction):
 async def crypto(interaction: discord.Interaction):
     await interaction.response.defer()
     try:
-        scan_results, _ = await asyncio.to_thread(scan_crypto)
+        scan_results, _ = await scan_group_async(CRYPTO_ASSETS)
 
         if not scan_results:
             await interaction.followup.send("**Crypto** - No setups found.")
@@ -536,9 +657,7 @@ async def crypto(interaction: discord.Interaction):
 async def com(interaction: discord.Interaction):
     await interaction.response.defer()
     try:
-        scan_results_m, _ = await asyncio.to_thread(scan_metals)
-        scan_results_e, _ = await asyncio.to_thread(scan_energies)
-        combined = scan_results_m + scan_results_e
+        combined, _ = await scan_group_async(METALS + ENERGIES)
 
         if not combined:
             await interaction.followup.send("**Commodities** - No setups found.")
@@ -558,7 +677,7 @@ async def com(interaction: discord.Interaction):
 async def indices(interaction: discord.Interaction):
     await interaction.response.defer()
     try:
-        scan_results, _ = await asyncio.to_thread(scan_indices)
+        scan_results, _ = await scan_group_async(INDICES)
 
         if not scan_results:
             await interaction.followup.send("**Indices** - No setups found.")
@@ -578,9 +697,9 @@ async def indices(interaction: discord.Interaction):
 async def market(interaction: discord.Interaction):
     await interaction.response.defer()
     try:
-        markets = await asyncio.to_thread(scan_all_markets)
+        markets = await scan_all_markets_async()
 
-        messages = format_autoscan_output(markets)
+        messages = await asyncio.to_thread(format_autoscan_output, markets)
         
         if not messages:
             await interaction.followup.send("**Market Scan** - No setups found.")
@@ -601,21 +720,25 @@ async def trade(interaction: discord.Interaction):
         await interaction.response.send_message("No active trades being tracked.")
         return
 
-    lines: list[str] = []
-    lines.append("**Active Trades**")
-    lines.append("")
+    symbols = list({slot.trade.symbol for slot in ACTIVE_TRADES.values()})
+    live_prices = await asyncio.to_thread(get_current_prices_cached, symbols)
+
+    lines: list[str] = ["**Active Trades**", ""]
 
-    for key, t in ACTIVE_TRADES.items():
-        emoji = "[BULL]" if t.direction == "bullish" else "[BEAR]"
+    for key, slot in ACTIVE_TRADES.items():
+        t = slot.trade
+        emoji = _DIRECTION_TAGS[slot.sign]
         entry = t.entry if t.entry is not None else 0.0
         sl = t.stop_loss if t.stop_loss is not None else 0.0
 
-        current_price, rr = _compute_trade_progress(t)
+        current_price, rr = _compute_trade_progress(t, live_prices)
         rr_str = f"{rr:+.2f}R" if rr == rr else "N/A"
 
-        lines.append(f"{emoji} **{t.symbol}** | {t.direction.upper()} | {t.confluence_score}/7")
-        lines.append(f"   Entry: {entry:.5f} | SL: {sl:.5f} | Progress: {rr_str}")
-        lines.append("")
+        lines.extend((
+            f"{emoji} **{t.symbol}** | {t.direction.upper()} | {t.confluence_score}/7",
+            f"   Entry: {entry:.5f} | SL: {sl:.5f} | Progress: {rr_str}",
+            "",
+        ))
 
     msg = "\n".join(lines)
     await interaction.response.send_message(msg[:2000])
@@ -641,9 +764,11 @@ async def live(interaction: discord.Interaction):
             "Crypto": CRYPTO_ASSETS,
         }
 
-        lines: list[str] = []
-        lines.append("**Live Prices (Real-time)**")
-        lines.append("")
+        # One pricing request for every group, split back out below
+        all_symbols = list(dict.fromkeys(sym for symbols in groups.values() for sym in symbols))
+        prices = await asyncio.to_thread(get_current_prices_cached, all_symbols) if all_symbols else {}
+
+        lines: list[str] = ["**Live Prices (Real-time)**", ""]
 
         for name, symbols in groups.items():
             lines.append(f"**{name}**")
@@ -652,14 +777,10 @@ async def live(interaction: discord.Interaction):
                 lines.append("")
                 continue
 
-            prices = await asyncio.to_thread(get_current_prices, symbols)
-            
-            for sym in symbols:
-                if sym in prices:
-                    mid = prices[sym]["mid"]
-                    lines.append(f"{sym}: `{_format_price(mid)}`")
-                else:
-                    lines.append(f"{sym}: N/A")
+            lines.extend(
+                f"{sym}: `{_format_price(prices[sym]['mid'])}`" if sym in prices else f"{sym}: N/A"
+                for sym in symbols
+            )
             lines.append("")
 
         msg = "\n".join(lines)
@@ -687,6 +808,9 @@ async def backtest_cmd(interaction: discord.Interaction, asset: str, period: str
         if period.strip().isdigit() and len(period.strip()) == 4:
             from backtest import run_yearly_backtest, validate_asset_performance
             year = int(period.strip())
+            # Months run serially in a worker thread: a process pool would
+            # fork the bot while its other threads may hold locks. Offline
+            # runs get the pool via `python backtest.py <asset> <year>`.
             result = await asyncio.to_thread(run_yearly_backtest, asset_clean, year)
             
             # Format yearly results with validation
@@ -717,8 +841,8 @@ async def backtest_cmd(interaction: discord.Interaction, asset: str, period: str
             msg = "\n".join(lines)
         else:
             # Single period backtest
-            result = run_backtest(asset_clean, period)
-            msg = format_backtest_result(result)
+            result = await asyncio.to_thread(run_backtest, asset_clean, period)
+            msg = await asyncio.to_thread(format_backtest_result, result)
         
         chunks = split_message(msg, limit=1900)
         for chunk in chunks:
@@ -772,16 +896,10 @@ async def debug_cmd(interaction: discord.Interaction):
         if bot.user:
             uptime_str = f"Online as {bot.user.name}"
         
-        scan_ch = bot.get_channel(SCAN_CHANNEL_ID)
-        trades_ch = bot.get_channel(TRADES_CHANNEL_ID)
-        updates_ch = bot.get_channel(TRADE_UPDATES_CHANNEL_ID)
-        
         channels_status = []
-        channels_status.append(f"Scan: {'OK' if scan_ch else 'NOT FOUND'}")
-        channels_status.append(f"Trades: {'OK' if trades_ch else 'NOT FOUND'}")
-        channels_status.append(f"Updates: {'OK' if updates_ch else 'NOT FOUND'}")
-        
-        profile = ACTIVE_ACCOUNT_PROFILE
+        channels_status.append(f"Scan: {'OK' if _channels.get('scan') else 'NOT FOUND'}")
+        channels_status.append(f"Trades: {'OK' if _channels.get('trades') else 'NOT FOUND'}")
+        channels_status.append(f"Updates: {'OK' if _channels.get('updates') else 'NOT FOUND'}")
         
         msg = (
             "**Blueprint Trader AI - Debug Info**\n\n"
@@ -793,14 +911,7 @@ async def debug_cmd(interaction: discord.Interaction):
             f"  {' | '.join(channels_status)}\n\n"
             f"**Active Trades:** {len(ACTIVE_TRADES)}\n"
             f"**Cache:** {cache_stats['cached_items']} items, {cache_stats['hit_rate_pct']}% hit rate\n\n"
-            f"**Account Profile:** {profile.display_name}\n"
-            f"  Balance: ${profile.starting_balance:,.0f}\n"
-            f"  Risk/Trade: {profile.risk_per_trade_pct*100:.1f}%\n"
-            f"  Max Daily Loss: {profile.max_daily_loss_pct*100:.0f}%\n"
-            f"  Max Total Loss: {profile.max_total_loss_pct*100:.0f}%\n"
-            f"  Max Concurrent: {profile.max_concurrent_trades} trades\n"
-            f"  Phase 1 Target: {profile.phases[0].profit_target_pct*100:.0f}%\n"
-            f"  Phase 2 Target: {profile.phases[1].profit_target_pct*100:.0f}%\n\n"
+            f"{_DEBUG_PROFILE_TEXT}"
             f"**System:** Python {platform.python_version()}"
         )
         
@@ -869,26 +980,17 @@ async def profile_cmd(interaction: discord.Interaction):
 )
 async def pass_command(interaction: discord.Interaction, month: int, year: int):
     """Simulate a The5ers challenge for a given month/year."""
-    if not 1 <= month <= 12:
-        await interaction.response.send_message(
-            "Invalid month. Please enter a value between 1 and 12.",
-            ephemeral=True
-        )
-        return
-    
-    if not 2020 <= year <= 2030:
-        await interaction.response.send_message(
-            "Invalid year. Please enter a value between 2020 and 2030.",
-            ephemeral=True
-        )
+    error = _validate_month_year(month, year)
+    if error:
+        await interaction.response.send_message(error, ephemeral=True)
         return
     
     await interaction.response.defer()
     
     try:
-        result = await asyncio.to_thread(simulate_challenge_for_month, year, month)
+        result = await _simulate_month_shared(year, month)
         
-        output = format_challenge_result(result)
+        output = await asyncio.to_thread(format_challenge_result, result)
         
         if result.both_passed:
             color = discord.Color.green()
@@ -916,82 +1018,74 @@ async def pass_command(interaction: discord.Interaction, month: int, year: int):
 )
 async def output_command(interaction: discord.Interaction, month: int, year: int):
     """Export all trades from challenge simulation grouped by asset with entry/exit dates and prices."""
-    if not 1 <= month <= 12:
-        await interaction.response.send_message(
-            "Invalid month. Please enter a value between 1 and 12.",
-            ephemeral=True
-        )
-        return
-    
-    if not 2020 <= year <= 2030:
-        await interaction.response.send_message(
-            "Invalid year. Please enter a value between 2020 and 2030.",
-            ephemeral=True
-        )
+    error = _validate_month_year(month, year)
+    if error:
+        await interaction.response.send_message(error, ephemeral=True)
         return
     
     await interaction.response.defer()
     
     try:
-        result = await asyncio.to_thread(simulate_challenge_for_month, year, month)
+        result = await _simulate_month_shared(year, month)
+        month_name = calendar.month_name[month]
         
         if not result.trades:
-            await interaction.followup.send(f"No trades found for {calendar.month_name[month]} {year}.", ephemeral=True)
+            await interaction.followup.send(f"No trades found for {month_name} {year}.", ephemeral=True)
             return
         
         # Group trades by asset
-        trades_by_asset = {}
+        trades_by_asset: defaultdict[str, list] = defaultdict(list)
         for trade in result.trades:
-            asset = trade.get("asset", "UNKNOWN")
-            if asset not in trades_by_asset:
-                trades_by_asset[asset] = []
-            trades_by_asset[asset].append(trade)
+            trades_by_asset[trade.asset or "UNKNOWN"].append(trade)
         
-        # Format output by asset
+        # Format output by asset, collecting each message's parts and joining
+        # once when it is full
         messages = []
-        current_msg = f"**Trade Export: {calendar.month_name[month]} {year}**\n"
-        current_msg += f"Total Trades: {len(result.trades)} | Period: {result.trading_days} trading days\n"
-        current_msg += "=" * 50 + "\n\n"
+        parts = [
+            f"**Trade Export: {month_name} {year}**\n"
+            f"Total Trades: {len(result.trades)} | Period: {result.trading_days} trading days\n"
+            f"{'=' * 50}\n\n"
+        ]
+        size = len(parts[0])
         
         for asset in sorted(trades_by_asset.keys()):
             trades = trades_by_asset[asset]
-            asset_msg = f"**{asset}** ({len(trades)} trades)\n"
+            asset_header = f"**{asset}** ({len(trades)} trades)\n"
             
             for i, trade in enumerate(trades, 1):
-                entry_date = trade.get("entry_date", "N/A")
-                entry_price = trade.get("entry", 0)
-                direction = trade.get("direction", "?")
-                sl = trade.get("sl", 0)
-                tp1 = trade.get("tp1", 0)
-                tp2 = trade.get("tp2", 0)
-                tp3 = trade.get("tp3", 0)
-                exit_date = trade.get("exit_date", "N/A")
-                exit_reason = trade.get("exit_reason", "?")
-                rr = trade.get("rr", 0)
-                
                 trade_line = (
-                    f"{i}. [{entry_date}] {direction.upper()}\n"
-                    f"   Entry: {entry_price:.5f} | SL: {sl:.5f}\n"
-                    f"   TP1: {tp1:.5f} | TP2: {tp2:.5f} | TP3: {tp3:.5f}\n"
-                    f"   Exit: {exit_reason} @ {exit_date} | R/R: {rr:+.2f}R\n\n"
+                    f"{i}. [{trade.entry_date}] {trade.direction.upper()}\n"
+                    f"   Entry: {trade.entry:.5f} | SL: {trade.sl:.5f}\n"
+                    f"   TP1: {trade.tp1:.5f} | TP2: {trade.tp2:.5f} | TP3: {trade.tp3:.5f}\n"
+                    f"   Exit: {trade.exit_reason} @ {trade.exit_date} | R/R: {trade.rr:+.2f}R\n\n"
                 )
+                # The asset header goes out with its first trade, so it is
+                # budgeted together with that line
+                header = asset_header if i == 1 else ""
                 
-                if len(current_msg) + len(asset_msg) + len(trade_line) > 1900:
-                    messages.append(current_msg + asset_msg)
-                    current_msg = ""
-                    asset_msg = f"**{asset}** (continued)\n"
+                if size and size + len(header) + len(trade_line) > 1900:
+                    messages.append("".join(parts))
+                    if not header:
+                        header = f"**{asset}** (continued)\n"
+                    parts = []
+                    size = 0
                 
-                asset_msg += trade_line
-            
-            current_msg += asset_msg
+                if header:
+                    parts.append(header)
+                    size += len(header)
+                parts.append(trade_line)
+                size += len(trade_line)
         
-        if current_msg.strip():
-            messages.append(current_msg)
+        last_msg = "".join(parts)
+        if last_msg.strip():
+            messages.append(last_msg)
         
-        # Send all messages
+        # The loop above keeps messages within 1900 characters; anything
+        # longer (e.g. a very long asset name) is split rather than rejected
         for msg in messages:
-            chunks = split_message(msg, limit=1900)
-            for chunk in chunks:
+            if len(msg) > 1900:
+                print(f"[/output] Message is {len(msg)} chars, splitting")
+            for chunk in split_message(msg, limit=1900):
                 await interaction.followup.send(chunk)
     
     except Exception as e:
@@ -999,6 +1093,13 @@ async def output_command(interaction: discord.Interaction, month: int, year: int
         await interaction.followup.send(f"Error exporting trades: {str(e)}", ephemeral=True)
 
 
+async def _send_text_messages(channel: discord.abc.Messageable, messages: list[str]) -> None:
+    """Send each message to the channel in order, split under Discord's limit."""
+    for msg in messages:
+        for chunk in split_message(msg, limit=1900):
+            await channel.send(chunk)
+
+
 @tasks.loop(hours=SCAN_INTERVAL_HOURS)
 async def autoscan_loop():
     await bot.wait_until_ready()
@@ -1006,118 +1107,141 @@ async def autoscan_loop():
     
     clear_cache()
 
-    scan_channel = bot.get_channel(SCAN_CHANNEL_ID)
-    trades_channel = bot.get_channel(TRADES_CHANNEL_ID)
+    scan_channel = _channels.get("scan")
+    trades_channel = _channels.get("trades")
 
     if scan_channel is None:
         print("Scan channel not found.")
         return
 
-    markets = await asyncio.to_thread(scan_all_markets)
+    markets = await scan_all_markets_async()
 
-    messages = format_autoscan_output(markets)
-    for msg in messages:
-        chunks = split_message(msg, limit=1900)
-        for chunk in chunks:
-            await scan_channel.send(chunk)
+    # Post the scan summary in the background while the trades below are
+    # priced and activated; it is awaited before the scan finishes
+    messages = await asyncio.to_thread(format_autoscan_output, markets)
+    summary_task = asyncio.create_task(_send_text_messages(scan_channel, messages))
 
-    if trades_channel is not None:
-        active_trade_symbols = []
-        pending_trades = []
+    # Always collect the summary task and drain the embed queue, even if
+    # activation or the update check below raises
+    try:
+        if trades_channel is not None:
+            active_trade_symbols: set[str] = set()
+            pending_trades = []
         
-        for group_name, (scan_results, trade_ideas) in markets.items():
-            for trade in trade_ideas:
-                if trade.status != "active":
-                    continue
-                trade_key = f"{trade.symbol}_{trade.direction}"
-                if trade_key in ACTIVE_TRADES:
-                    continue
-                active_trade_symbols.append(trade.symbol)
-                pending_trades.append(trade)
+            for scan_results, trade_ideas in markets.values():
+                for trade in trade_ideas:
+                    if trade.status != "active" or f"{trade.symbol}_{trade.direction}" in ACTIVE_TRADES:
+                        continue
+                    active_trade_symbols.add(trade.symbol)
+                    pending_trades.append(trade)
         
-        live_prices = {}
-        if active_trade_symbols:
-            print(f"[autoscan] Fetching live prices for {len(active_trade_symbols)} symbols...")
-            live_prices = await asyncio.to_thread(get_current_prices, list(set(active_trade_symbols)))
-            print(f"[autoscan] Got live prices for {len(live_prices)} symbols")
+            live_prices = {}
+            if active_trade_symbols:
+                print(f"[autoscan] Fetching live prices for {len(active_trade_symbols)} symbols...")
+                live_prices = await asyncio.to_thread(get_current_prices_cached, list(active_trade_symbols))
+                print(f"[autoscan] Got live prices for {len(live_prices)} symbols")
         
-        trade_state = get_trade_state()
+            trade_state = get_trade_state()
+            # Trades are only marked posted once Discord has accepted their embed
+            posted: list[tuple[str, asyncio.Future]] = []
         
-        for trade in pending_trades:
-            trade_key = f"{trade.symbol}_{trade.direction}"
-            trade_id = trade_state.generate_trade_id(trade.symbol, trade.direction, trade.entry)
+            for trade in pending_trades:
+                trade_key = f"{trade.symbol}_{trade.direction}"
+                trade_id = trade_state.generate_trade_id(trade.symbol, trade.direction, trade.entry)
             
-            if trade_state.is_trade_posted(trade_id):
-                print(f"[autoscan] {trade.symbol}: SKIPPED - Already posted in previous session")
-                continue
+                if trade_state.is_trade_posted(trade_id):
+                    print(f"[autoscan] {trade.symbol}: SKIPPED - Already posted in previous session")
+                    continue
             
-            live_price_data = live_prices.get(trade.symbol)
-            if not live_price_data:
-                print(f"[autoscan] {trade.symbol}: SKIPPED - Could not fetch live price (check OANDA API credentials)")
-                continue
+                live_price_data = live_prices.get(trade.symbol)
+                if not live_price_data:
+                    print(f"[autoscan] {trade.symbol}: SKIPPED - Could not fetch live price (check OANDA API credentials)")
+                    continue
             
-            live_mid = live_price_data.get("mid", 0)
-            if live_mid <= 0:
-                print(f"[autoscan] {trade.symbol}: SKIPPED - Live price invalid ({live_mid})")
-                continue
+                live_mid = live_price_data.get("mid", 0)
+                if live_mid <= 0:
+                    print(f"[autoscan] {trade.symbol}: SKIPPED - Live price invalid ({live_mid})")
+                    continue
             
-            sizing = calculate_position_size_5ers(
-                symbol=trade.symbol,
-                entry_price=live_mid,
-                stop_price=trade.stop_loss,
-            )
+                sizing = calculate_position_size_5ers(
+                    symbol=trade.symbol,
+                    entry_price=live_mid,
+                    stop_price=trade.stop_loss,
+                )
             
-            success, message = activate_trade(trade, live_mid, sizing)
+                success, message = activate_trade(trade, live_mid, sizing)
             
-            if not success:
-                print(f"[autoscan] {trade.symbol}: BLOCKED by risk manager - {message}")
-                blocked_embed = discord.Embed(
-                    title=f"Trade Blocked: {trade.symbol}",
-                    description=message,
-                    color=discord.Color.orange(),
-                )
-                blocked_embed.add_field(name="Direction", value=trade.direction, inline=True)
-                blocked_embed.add_field(name="Risk USD", value=f"${sizing.get('risk_usd', 0):.2f}", inline=True)
-                await trades_channel.send(embed=blocked_embed)
-                continue
+                if not success:
+                    print(f"[autoscan] {trade.symbol}: BLOCKED by risk manager - {message}")
+                    blocked_embed = discord.Embed(
+                        title=f"Trade Blocked: {trade.symbol}",
+                        description=message,
+                        color=discord.Color.orange(),
+                    )
+                    blocked_embed.add_field(name="Direction", value=trade.direction, inline=True)
+                    blocked_embed.add_field(name="Risk USD", value=f"${sizing.get('risk_usd', 0):.2f}", inline=True)
+                    await enqueue_embed(trades_channel, blocked_embed)
+                    continue
             
-            print(f"[autoscan] {trade.symbol}: Using live price {live_mid:.5f} as entry - {message}")
+                print(f"[autoscan] {trade.symbol}: Using live price {live_mid:.5f} as entry - {message}")
 
-            confluence_items = build_confluence_list(trade)
-            entry_time = TRADE_ENTRY_DATES.get(trade_key)
-            
-            embed = create_setup_embed(
-                symbol=trade.symbol,
-                direction=trade.direction,
-                timeframe="H4",
-                entry=trade.entry,
-                stop_loss=trade.stop_loss,
-                tp1=trade.tp1,
-                tp2=trade.tp2,
-                tp3=trade.tp3,
-                confluence_score=trade.confluence_score,
-                confluence_items=confluence_items,
-                description=f"High-confluence setup with {trade.confluence_score}/7 factors aligned.",
-                entry_datetime=entry_time,
-            )
+                confluence_items = build_confluence_list(trade)
+                entry_time = ACTIVE_TRADES[trade_key].entry_dt
             
-            if "Warning:" in message:
-                embed.add_field(name="Risk Warning", value=message.split("Warning: ")[-1].rstrip(")"), inline=False)
+                embed = create_setup_embed(
+                    symbol=trade.symbol,
+                    direction=trade.direction,
+                    timeframe="H4",
+                    entry=trade.entry,
+                    stop_loss=trade.stop_loss,
+                    tp1=trade.tp1,
+                    tp2=trade.tp2,
+                    tp3=trade.tp3,
+                    confluence_score=trade.confluence_score,
+                    confluence_items=confluence_items,
+                    description=f"High-confluence setup with {trade.confluence_score}/7 factors aligned.",
+                    entry_datetime=entry_time,
+                )
             
-            await trades_channel.send(embed=embed)
+                if "Warning:" in message:
+                    embed.add_field(name="Risk Warning", value=message.split("Warning: ")[-1].rstrip(")"), inline=False)
             
-            trade_state.mark_trade_posted(trade_id)
+                posted.append((trade_id, await enqueue_embed(trades_channel, embed)))
         
-        trade_state.update_scan_time()
-
-    updates_channel = bot.get_channel(TRADE_UPDATES_CHANNEL_ID)
-    if updates_channel is not None and ACTIVE_TRADES:
-        await check_trade_updates(updates_channel)
-
+            if posted:
+                delivered = await asyncio.gather(*(future for _, future in posted))
+                sent_ids = []
+                for (trade_id, _), ok in zip(posted, delivered):
+                    if ok:
+                        sent_ids.append(trade_id)
+                    else:
+                        print(f"[autoscan] {trade_id}: setup embed not delivered, not marking as posted")
+                trade_state.mark_trades_posted(sent_ids)
+        
+            trade_state.update_scan_time()
+            trade_state.flush()
+
+        updates_channel = _channels.get("updates")
+        if updates_channel is not None and ACTIVE_TRADES:
+            await check_trade_updates(updates_channel)
+    finally:
+        try:
+            await summary_task
+        except Exception as e:
+            print(f"[autoscan] Error posting scan summary: {e}")
+        await drain_embed_queue()
     print("Autoscan finished.")
 
 
 if not DISCORD_TOKEN:
     raise ValueError("DISCORD_BOT_TOKEN not found. Set it in Replit Secrets.")
 
+# uvloop is optional; bot.run starts its loop through asyncio.run, which uses this policy
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    print("Using uvloop event loop.")
+except ImportError:
+    pass
+
 bot.run(DISCORD_TOKEN)
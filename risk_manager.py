@@ -11,14 +11,20 @@ Designed to prevent challenge failures by blocking trades
 that would violate rules or get too close to limits.
 """
 
+from bisect import bisect_right
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, date, timedelta, timezone
-from typing import Optional, Dict, List, Tuple
+from typing import Deque, Optional, Dict, List, Tuple
 from enum import Enum
 
 from account_profiles import AccountProfile, get_active_profile
 
 
+# Closed trades are only kept for inspection; older ones are dropped past this
+MAX_CLOSED_TRADES_IN_MEMORY = 5000
+
+
 class RiskCheckResult(Enum):
     """Result of a risk check."""
     ALLOWED = "allowed"
@@ -32,7 +38,7 @@ class RiskCheckResult(Enum):
     WARNING_NEAR_LIMIT = "warning_near_limit"
 
 
-@dataclass
+@dataclass(slots=True)
 class TradeRecord:
     """Record of an open or closed trade for risk tracking."""
     trade_id: str
@@ -50,7 +56,7 @@ class TradeRecord:
     is_open: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class DailyPnL:
     """Track P&L for a specific trading day."""
     date: date
@@ -87,29 +93,53 @@ class RiskManager:
         self.current_balance = self.starting_balance
         self.peak_balance = self.starting_balance
         
+        # Limits in USD; the profile and starting balance are fixed for this manager
+        self._max_concurrent = self.profile.max_concurrent_trades
+        self._safe_daily_limit_usd = self.starting_balance * self.profile.safe_daily_loss_limit
+        self._safe_total_limit_usd = self.starting_balance * self.profile.safe_total_loss_limit
+        self._friday_cutoff_hour = self.profile.friday_cutoff_hour_utc
+        self._monday_cooldown_s = self.profile.monday_cooldown_hours * 3600
+        
         self.open_trades: Dict[str, TradeRecord] = {}
-        self.closed_trades: List[TradeRecord] = []
+        # Running sum of risk_usd over open_trades, kept by open_trade/close_trade
+        self._open_risk_usd = 0.0
+        self.closed_trades: Deque[TradeRecord] = deque(maxlen=MAX_CLOSED_TRADES_IN_MEMORY)
         self.daily_pnl: Dict[date, DailyPnL] = {}
+        # Last record returned by get_today_pnl, reused until the UTC date changes
+        self._today_date: Optional[date] = None
+        self._today_pnl: Optional[DailyPnL] = None
         
         self.current_phase = 1
         self.phase_start_balance = self.starting_balance
         
+        # Kept sorted by time, with the times mirrored in _news_times for bisect
         self.news_events: List[Tuple[datetime, str]] = []
+        self._news_times: List[datetime] = []
+        self._news_blackout = timedelta(minutes=self.profile.news_blackout_minutes)
     
     def get_current_date(self) -> date:
         """Get current date in UTC."""
         return datetime.now(timezone.utc).date()
     
-    def get_today_pnl(self) -> DailyPnL:
-        """Get or create today's P&L record."""
-        today = self.get_current_date()
-        if today not in self.daily_pnl:
-            self.daily_pnl[today] = DailyPnL(date=today)
-        return self.daily_pnl[today]
+    def get_today_pnl(self, now: Optional[datetime] = None) -> DailyPnL:
+        """
+        Get or create today's P&L record.
+        
+        Pass now (the current time, tz-aware) when the caller has already read
+        the clock, to save another read.
+        """
+        today = now.astimezone(timezone.utc).date() if now is not None else self.get_current_date()
+        if today != self._today_date:
+            record = self.daily_pnl.get(today)
+            if record is None:
+                record = self.daily_pnl[today] = DailyPnL(date=today)
+            self._today_date = today
+            self._today_pnl = record
+        return self._today_pnl
     
     def get_open_risk_usd(self) -> float:
         """Total risk in USD from all open trades."""
-        return sum(t.risk_usd for t in self.open_trades.values())
+        return self._open_risk_usd
     
     def get_open_risk_pct(self) -> float:
         """Total risk as percentage of starting balance."""
@@ -164,31 +194,34 @@ class RiskManager:
             and message provides details.
         """
         now = check_time or datetime.now(timezone.utc)
+        # check_time may be hypothetical, so only our own clock read is reused as "today"
+        today_now = now if check_time is None else None
         
         time_check = self._check_trading_time(now)
         if time_check[0] != RiskCheckResult.ALLOWED:
             return time_check
         
-        if len(self.open_trades) >= self.profile.max_concurrent_trades:
+        if len(self.open_trades) >= self._max_concurrent:
             return (
                 RiskCheckResult.BLOCKED_CONCURRENT,
-                f"Max {self.profile.max_concurrent_trades} concurrent trades allowed. "
+                f"Max {self._max_concurrent} concurrent trades allowed. "
                 f"Currently have {len(self.open_trades)} open."
             )
         
-        new_open_risk = self.get_open_risk_usd() + risk_usd
-        max_open_risk = self.profile.get_max_open_risk_usd()
+        open_risk = self._open_risk_usd
+        new_open_risk = open_risk + risk_usd
+        max_open_risk = self.profile.max_open_risk_usd
         if new_open_risk > max_open_risk:
             return (
                 RiskCheckResult.BLOCKED_OPEN_RISK,
                 f"Adding this trade would exceed max open risk of "
                 f"${max_open_risk:,.0f} ({self.profile.max_open_risk_pct*100:.1f}%). "
-                f"Current open risk: ${self.get_open_risk_usd():,.0f}."
+                f"Current open risk: ${open_risk:,.0f}."
             )
         
-        daily_pnl = self.get_today_pnl().realized_pnl_usd
+        daily_pnl = self.get_today_pnl(today_now).realized_pnl_usd
         projected_daily_loss = daily_pnl - new_open_risk
-        safe_daily_limit = self.starting_balance * self.profile.get_safe_daily_loss_limit()
+        safe_daily_limit = self._safe_daily_limit_usd
         
         if abs(projected_daily_loss) > safe_daily_limit:
             return (
@@ -200,7 +233,7 @@ class RiskManager:
         
         current_dd = self.get_total_drawdown_usd()
         projected_total_loss = current_dd + new_open_risk
-        safe_total_limit = self.starting_balance * self.profile.get_safe_total_loss_limit()
+        safe_total_limit = self._safe_total_limit_usd
         
         if projected_total_loss > safe_total_limit:
             return (
@@ -229,18 +262,20 @@ class RiskManager:
     
     def _check_trading_time(self, now: datetime) -> Tuple[RiskCheckResult, str]:
         """Check if current time allows new trades."""
-        if now.weekday() == 4:
-            if now.hour >= self.profile.friday_cutoff_hour_utc:
+        weekday = now.weekday()
+        if weekday == 4:
+            if now.hour >= self._friday_cutoff_hour:
                 return (
                     RiskCheckResult.BLOCKED_FRIDAY_CUTOFF,
                     f"No new trades after {self.profile.friday_cutoff_hour_utc}:00 UTC on Friday. "
                     f"Current time: {now.strftime('%H:%M')} UTC."
                 )
         
-        if now.weekday() == 0:
-            market_open = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            hours_since_open = (now - market_open).total_seconds() / 3600
-            if hours_since_open < self.profile.monday_cooldown_hours:
+        elif weekday == 0:
+            # Whole seconds since midnight; the fraction cannot change the comparison
+            seconds_since_open = now.hour * 3600 + now.minute * 60 + now.second
+            if seconds_since_open < self._monday_cooldown_s:
+                hours_since_open = (seconds_since_open + now.microsecond / 1e6) / 3600
                 return (
                     RiskCheckResult.BLOCKED_MONDAY_COOLDOWN,
                     f"Monday cooldown in effect. Wait {self.profile.monday_cooldown_hours}h "
@@ -248,10 +283,13 @@ class RiskManager:
                     f"{self.profile.monday_cooldown_hours - hours_since_open:.1f}h."
                 )
         
-        for event_time, event_name in self.news_events:
-            blackout_start = event_time - timedelta(minutes=self.profile.news_blackout_minutes)
-            blackout_end = event_time + timedelta(minutes=self.profile.news_blackout_minutes)
-            if blackout_start <= now <= blackout_end:
+        # The latest event starting its blackout by now is the only one that
+        # can still be in effect (it also ends last)
+        idx = bisect_right(self._news_times, now + self._news_blackout) - 1
+        if idx >= 0:
+            event_time, event_name = self.news_events[idx]
+            blackout_end = event_time + self._news_blackout
+            if now <= blackout_end:
                 return (
                     RiskCheckResult.BLOCKED_NEWS_EVENT,
                     f"News blackout in effect for: {event_name}. "
@@ -262,14 +300,23 @@ class RiskManager:
     
     def add_news_event(self, event_time: datetime, event_name: str) -> None:
         """Add a high-impact news event to block trading around."""
-        self.news_events.append((event_time, event_name))
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
-        self.news_events = [(t, n) for t, n in self.news_events if t > cutoff]
+        idx = bisect_right(self._news_times, event_time)
+        self._news_times.insert(idx, event_time)
+        self.news_events.insert(idx, (event_time, event_name))
+        # Events are sorted, so the expired ones are a prefix
+        stale = bisect_right(self._news_times, datetime.now(timezone.utc) - timedelta(hours=24))
+        if stale:
+            del self._news_times[:stale]
+            del self.news_events[:stale]
     
-    def open_trade(self, trade: TradeRecord) -> None:
-        """Record a new open trade."""
+    def open_trade(self, trade: TradeRecord, now: Optional[datetime] = None) -> None:
+        """Record a new open trade. now is the current time, if already known."""
+        previous = self.open_trades.get(trade.trade_id)
+        if previous is not None:
+            self._open_risk_usd -= previous.risk_usd
         self.open_trades[trade.trade_id] = trade
-        today_pnl = self.get_today_pnl()
+        self._open_risk_usd += trade.risk_usd
+        today_pnl = self.get_today_pnl(now)
         today_pnl.trades_opened += 1
     
     def close_trade(
@@ -284,9 +331,12 @@ class RiskManager:
             return None
         
         trade = self.open_trades.pop(trade_id)
+        # Reset when flat so float rounding can't accumulate across trades
+        self._open_risk_usd = self._open_risk_usd - trade.risk_usd if self.open_trades else 0.0
         trade.is_open = False
         trade.exit_price = exit_price
-        trade.exit_datetime = exit_datetime or datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc) if exit_datetime is None else None
+        trade.exit_datetime = exit_datetime or now
         trade.pnl_usd = pnl_usd
         
         self.closed_trades.append(trade)
@@ -295,7 +345,7 @@ class RiskManager:
         if self.current_balance > self.peak_balance:
             self.peak_balance = self.current_balance
         
-        today_pnl = self.get_today_pnl()
+        today_pnl = self.get_today_pnl(now)
         today_pnl.realized_pnl_usd += pnl_usd
         today_pnl.trades_closed += 1
         
@@ -320,9 +370,9 @@ class RiskManager:
         progress_pct = (current_profit_pct / target_pct) * 100 if target_pct > 0 else 0
         
         min_day_profit = self.phase_start_balance * phase.min_profit_per_day_pct
+        # Same test as DailyPnL.is_profitable_day, without a method call per day
         profitable_days = sum(
-            1 for d in self.daily_pnl.values()
-            if d.is_profitable_day(min_day_profit)
+            d.realized_pnl_usd >= min_day_profit for d in self.daily_pnl.values()
         )
         
         return {
@@ -375,8 +425,11 @@ class RiskManager:
         self.current_balance = self.starting_balance
         self.peak_balance = self.starting_balance
         self.open_trades.clear()
+        self._open_risk_usd = 0.0
         self.closed_trades.clear()
         self.daily_pnl.clear()
+        self._today_date = None
+        self._today_pnl = None
         self.current_phase = 1
         self.phase_start_balance = self.starting_balance
 
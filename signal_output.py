@@ -18,18 +18,26 @@ Signal format includes all necessary data for order execution:
 - Unique signal ID
 """
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Optional, List, Dict
 import json
+import functools
 import hashlib
+import itertools
+import struct
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from config import ACCOUNT_SIZE, RISK_PER_TRADE_PCT, ACTIVE_ACCOUNT_PROFILE
 from position_sizing import calculate_position_size_5ers
 from risk_manager import get_risk_manager, RiskCheckResult
 
 
-@dataclass
+@dataclass(slots=True)
 class MT5Signal:
     """
     Trade signal formatted for MT5 execution.
@@ -67,9 +75,35 @@ class MT5Signal:
     valid: bool = True
     rejection_reason: str = ""
     
+    # MT5 magic number derived from signal_id; set by create_signals_batch
+    magic: int = field(default=0, init=False, repr=False, compare=False)
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
-        return asdict(self)
+        return {
+            "signal_id": self.signal_id,
+            "timestamp": self.timestamp,
+            "symbol": self.symbol,
+            "symbol_mt5": self.symbol_mt5,
+            "direction": self.direction,
+            "order_type": self.order_type,
+            "entry_price": self.entry_price,
+            "stop_loss": self.stop_loss,
+            "take_profit_1": self.take_profit_1,
+            "take_profit_2": self.take_profit_2,
+            "take_profit_3": self.take_profit_3,
+            "lot_size": self.lot_size,
+            "risk_usd": self.risk_usd,
+            "risk_pct": self.risk_pct,
+            "stop_pips": self.stop_pips,
+            "account_size": self.account_size,
+            "profile_name": self.profile_name,
+            "confluence_score": self.confluence_score,
+            "status": self.status,
+            "notes": self.notes,
+            "valid": self.valid,
+            "rejection_reason": self.rejection_reason,
+        }
     
     def to_json(self) -> str:
         """Convert to JSON string."""
@@ -94,13 +128,23 @@ class MT5Signal:
             "sl": self.stop_loss,
             "tp": self.take_profit_1,
             "deviation": 20,
-            "magic": int(self.signal_id[:8], 16) % 1000000,
+            "magic": self.magic or signal_magic(self.signal_id),
             "comment": f"Blueprint_{self.signal_id}",
             "type_time": 0,
             "type_filling": 1,
         }
 
 
+# MT5 names these by the base alone (NAS100_USD -> NAS100)
+_BASE_ONLY_MT5_SYMBOLS = frozenset(("NAS100", "SPX500", "US30", "WTICO", "BCO", "NATGAS"))
+
+
+def signal_magic(signal_id: str) -> int:
+    """MT5 magic number for a signal ID."""
+    return int(signal_id[:8], 16) % 1000000
+
+
+@functools.lru_cache(maxsize=256)
 def oanda_to_mt5_symbol(oanda_symbol: str) -> str:
     """
     Convert OANDA symbol format to MT5 format.
@@ -111,21 +155,30 @@ def oanda_to_mt5_symbol(oanda_symbol: str) -> str:
     parts = oanda_symbol.split("_")
     if len(parts) == 2:
         base, quote = parts
-        if base in ("XAU", "XAG", "XPT", "XPD", "XCU"):
-            return f"{base}{quote}"
-        if base in ("NAS100", "SPX500", "US30"):
-            return base
-        if base in ("WTICO", "BCO", "NATGAS"):
+        if base in _BASE_ONLY_MT5_SYMBOLS:
             return base
         return f"{base}{quote}"
     return oanda_symbol.replace("_", "")
 
 
+_pack_signal_fields = struct.Struct("<HBBBBBIQ").pack
+_signal_seq = itertools.count()
+
+
 def generate_signal_id(symbol: str, direction: str, timestamp: Optional[datetime] = None) -> str:
     """Generate unique signal ID."""
     ts = timestamp or datetime.now(timezone.utc)
-    data = f"{symbol}_{direction}_{ts.isoformat()}_{id(ts)}"
-    return hashlib.md5(data.encode()).hexdigest()[:12].upper()
+    # 12 hex chars only need a 6-byte digest. The packed time fields replace
+    # isoformat(), and a process-wide sequence number (instead of id(ts))
+    # keeps IDs unique when two signals share a timestamp.
+    h = hashlib.blake2b(digest_size=6)
+    h.update(symbol.encode())
+    h.update(b"_")
+    h.update(direction.encode())
+    h.update(_pack_signal_fields(
+        ts.year, ts.month, ts.day, ts.hour, ts.minute, ts.second, ts.microsecond, next(_signal_seq)
+    ))
+    return h.hexdigest().upper()
 
 
 def create_signal_from_scan(
@@ -146,82 +199,122 @@ def create_signal_from_scan(
     Returns:
         MT5Signal ready for execution or with rejection_reason if invalid
     """
+    return create_signals_batch([scan_result], account_size, risk_pct, validate_risk)[0]
+
+
+def create_signals_batch(
+    scan_results: List,
+    account_size: Optional[float] = None,
+    risk_pct: Optional[float] = None,
+    validate_risk: bool = True,
+) -> List[MT5Signal]:
+    """
+    Create MT5-ready signals for several scan results at once.
+    
+    Same as calling create_signal_from_scan for each result, but the
+    timestamp, risk manager and profile lookups are done once per batch.
+    Each signal is risk-checked on its own, as if it were the only new trade.
+    """
     if account_size is None:
         account_size = ACCOUNT_SIZE
     if risk_pct is None:
         risk_pct = RISK_PER_TRADE_PCT
     
     now = datetime.now(timezone.utc)
-    signal_id = generate_signal_id(scan_result.symbol, scan_result.direction, now)
+    timestamp = now.isoformat()
+    rm = get_risk_manager() if validate_risk else None
+    profile_name = ACTIVE_ACCOUNT_PROFILE.display_name
     
-    if scan_result.entry is None or scan_result.stop_loss is None:
-        return MT5Signal(
+    signals = []
+    for scan_result in scan_results:
+        symbol = scan_result.symbol
+        signal_id = generate_signal_id(symbol, scan_result.direction, now)
+        magic = signal_magic(signal_id)
+        symbol_mt5 = oanda_to_mt5_symbol(symbol)
+        direction = "BUY" if scan_result.direction == "bullish" else "SELL"
+        
+        if scan_result.entry is None or scan_result.stop_loss is None:
+            signal = MT5Signal(
+                signal_id=signal_id,
+                timestamp=timestamp,
+                symbol=symbol,
+                symbol_mt5=symbol_mt5,
+                direction=direction,
+                order_type="MARKET",
+                entry_price=0,
+                stop_loss=0,
+                confluence_score=scan_result.confluence_score,
+                status="invalid",
+                valid=False,
+                rejection_reason="Missing entry or stop loss levels",
+            )
+            signal.magic = magic
+            signals.append(signal)
+            continue
+        
+        sizing = calculate_position_size_5ers(
+            symbol=symbol,
+            entry_price=scan_result.entry,
+            stop_price=scan_result.stop_loss,
+            account_size=account_size,
+            risk_pct=risk_pct,
+        )
+        
+        risk_check_result = RiskCheckResult.ALLOWED
+        risk_check_msg = ""
+        
+        if rm is not None:
+            risk_check_result, risk_check_msg = rm.can_add_trade(sizing["risk_usd"])
+        
+        is_valid = risk_check_result in (RiskCheckResult.ALLOWED, RiskCheckResult.WARNING_NEAR_LIMIT)
+        status = "approved" if is_valid else "rejected"
+        rejection = "" if is_valid else risk_check_msg
+        
+        signal = MT5Signal(
             signal_id=signal_id,
-            timestamp=now.isoformat(),
-            symbol=scan_result.symbol,
-            symbol_mt5=oanda_to_mt5_symbol(scan_result.symbol),
-            direction="BUY" if scan_result.direction == "bullish" else "SELL",
+            timestamp=timestamp,
+            symbol=symbol,
+            symbol_mt5=symbol_mt5,
+            direction=direction,
             order_type="MARKET",
-            entry_price=0,
-            stop_loss=0,
+            entry_price=scan_result.entry,
+            stop_loss=scan_result.stop_loss,
+            take_profit_1=scan_result.tp1,
+            take_profit_2=scan_result.tp2,
+            take_profit_3=scan_result.tp3,
+            lot_size=sizing["lot_size"],
+            risk_usd=sizing["risk_usd"],
+            risk_pct=sizing["risk_pct"],
+            stop_pips=sizing["stop_pips"],
+            account_size=account_size,
+            profile_name=profile_name,
             confluence_score=scan_result.confluence_score,
-            status="invalid",
-            valid=False,
-            rejection_reason="Missing entry or stop loss levels",
+            status=status,
+            notes=risk_check_msg if risk_check_result == RiskCheckResult.WARNING_NEAR_LIMIT else "",
+            valid=is_valid,
+            rejection_reason=rejection,
         )
+        signal.magic = magic
+        signals.append(signal)
     
-    sizing = calculate_position_size_5ers(
-        symbol=scan_result.symbol,
-        entry_price=scan_result.entry,
-        stop_price=scan_result.stop_loss,
-        account_size=account_size,
-        risk_pct=risk_pct,
-    )
-    
-    risk_check_result = RiskCheckResult.ALLOWED
-    risk_check_msg = ""
-    
-    if validate_risk:
-        rm = get_risk_manager()
-        risk_check_result, risk_check_msg = rm.can_add_trade(sizing["risk_usd"])
-    
-    is_valid = risk_check_result in (RiskCheckResult.ALLOWED, RiskCheckResult.WARNING_NEAR_LIMIT)
-    status = "approved" if is_valid else "rejected"
-    rejection = "" if is_valid else risk_check_msg
-    
-    return MT5Signal(
-        signal_id=signal_id,
-        timestamp=now.isoformat(),
-        symbol=scan_result.symbol,
-        symbol_mt5=oanda_to_mt5_symbol(scan_result.symbol),
-        direction="BUY" if scan_result.direction == "bullish" else "SELL",
-        order_type="MARKET",
-        entry_price=scan_result.entry,
-        stop_loss=scan_result.stop_loss,
-        take_profit_1=scan_result.tp1,
-        take_profit_2=scan_result.tp2,
-        take_profit_3=scan_result.tp3,
-        lot_size=sizing["lot_size"],
-        risk_usd=sizing["risk_usd"],
-        risk_pct=sizing["risk_pct"],
-        stop_pips=sizing["stop_pips"],
-        account_size=account_size,
-        profile_name=ACTIVE_ACCOUNT_PROFILE.display_name,
-        confluence_score=scan_result.confluence_score,
-        status=status,
-        notes=risk_check_msg if risk_check_result == RiskCheckResult.WARNING_NEAR_LIMIT else "",
-        valid=is_valid,
-        rejection_reason=rejection,
-    )
+    return signals
 
 
-def export_signals_to_file(signals: List[MT5Signal], filepath: str = "signals.json") -> str:
+def export_signals_to_file(
+    signals: List[MT5Signal],
+    filepath: str = "signals.json",
+    pretty: bool = True,
+) -> str:
     """
     Export signals to JSON file for MT5 executor to consume.
     
+    Uses orjson when it is installed, otherwise the stdlib encoder.
+    
     Args:
         signals: List of MT5Signal objects
         filepath: Output file path
+        pretty: Indent the JSON; pass False for compact output when the
+            file is only read by the executor
         
     Returns:
         Path to exported file
@@ -233,8 +326,14 @@ def export_signals_to_file(signals: List[MT5Signal], filepath: str = "signals.js
         "signals": [s.to_dict() for s in signals],
     }
     
-    with open(filepath, "w") as f:
-        json.dump(data, f, indent=2)
+    if orjson is not None:
+        with open(filepath, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0))
+    else:
+        # Without indent, json.dumps uses its C encoder
+        text = json.dumps(data, indent=2) if pretty else json.dumps(data, separators=(",", ":"))
+        with open(filepath, "w") as f:
+            f.write(text)
     
     return filepath
 
@@ -249,15 +348,17 @@ def format_signal_summary(signal: MT5Signal) -> str:
     emoji = "🟢" if signal.direction == "BUY" else "🔴"
     status_emoji = "✅" if signal.valid else "❌"
     
-    lines = [
-        f"{status_emoji} {emoji} **{signal.symbol_mt5}** {signal.direction}",
-        f"Entry: {signal.entry_price:.5f} | SL: {signal.stop_loss:.5f}",
-        f"Lots: {signal.lot_size:.2f} | Risk: ${signal.risk_usd:,.0f} ({signal.risk_pct*100:.2f}%)",
-        f"TP1: {signal.take_profit_1:.5f if signal.take_profit_1 else 'N/A'}",
-        f"ID: {signal.signal_id} | Status: {signal.status.upper()}",
-    ]
+    tp1 = f"{signal.take_profit_1:.5f}" if signal.take_profit_1 is not None else "N/A"
+    
+    summary = (
+        f"{status_emoji} {emoji} **{signal.symbol_mt5}** {signal.direction}\n"
+        f"Entry: {signal.entry_price:.5f} | SL: {signal.stop_loss:.5f}\n"
+        f"Lots: {signal.lot_size:.2f} | Risk: ${signal.risk_usd:,.0f} ({signal.risk_pct*100:.2f}%)\n"
+        f"TP1: {tp1}\n"
+        f"ID: {signal.signal_id} | Status: {signal.status.upper()}"
+    )
     
     if signal.rejection_reason:
-        lines.append(f"Reason: {signal.rejection_reason}")
+        summary += f"\nReason: {signal.rejection_reason}"
     
-    return "\n".join(lines)
+    return summary
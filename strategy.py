@@ -41,7 +41,7 @@ from strategy_core import (
 MAX_SIGNAL_AGE_DAYS = 5
 
 
-@dataclass
+@dataclass(slots=True)
 class ScanResult:
     symbol: str
     direction: str
@@ -64,6 +64,12 @@ class ScanResult:
     tp5: Optional[float] = None
     setup_type: str = ""
     what_to_look_for: str = ""
+    # Progress flags set by trade_state.evaluate_trades_for_updates
+    sl_hit: bool = False
+    tp1_hit: bool = False
+    tp2_hit: bool = False
+    tp3_hit: bool = False
+    is_closed: bool = False
 
 
 def _signal_to_scan_result(signal: Signal) -> ScanResult:
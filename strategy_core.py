@@ -258,6 +258,88 @@ def _find_pivots(candles: List[Dict], lookback: int = 5) -> Tuple[List[float], L
     return swing_highs, swing_lows
 
 
+def _atr_series(candles: List[Dict], period: int = 14) -> List[float]:
+    """
+    Calculate ATR for every prefix of a candle series in one pass.
+    
+    Args:
+        candles: List of OHLCV candle dictionaries
+        period: ATR period (default 14)
+    
+    Returns:
+        List where out[n] == _atr(candles[:n], period), for n in 0..len(candles)
+    """
+    out = [0.0] * (len(candles) + 1)
+    tr_values: List[float] = []
+    atr_val = 0.0
+    
+    for n in range(2, len(candles) + 1):
+        high = candles[n - 1].get("high")
+        low = candles[n - 1].get("low")
+        prev_close = candles[n - 2].get("close")
+        
+        if high is not None and low is not None and prev_close is not None:
+            tr = max(
+                high - low,
+                abs(high - prev_close),
+                abs(low - prev_close)
+            )
+            tr_values.append(tr)
+            if len(tr_values) == period:
+                atr_val = sum(tr_values) / period
+            elif len(tr_values) > period:
+                atr_val = (atr_val * (period - 1) + tr) / period
+        
+        if n < period + 1:
+            continue
+        if len(tr_values) < period:
+            out[n] = sum(tr_values) / len(tr_values) if tr_values else 0.0
+        else:
+            out[n] = atr_val
+    
+    return out
+
+
+def _pivot_series(candles: List[Dict], lookback: int = 5) -> Tuple[List[int], List[float], List[int], List[float]]:
+    """
+    Find swing highs and lows once over a full series, keeping their bar index.
+    
+    A pivot at bar i only looks at bars i-lookback..i+lookback, so the pivots
+    of any prefix candles[:n] are exactly the ones with index < n - lookback.
+    
+    Returns:
+        Tuple of (high_indices, swing_highs, low_indices, swing_lows)
+    """
+    high_idx: List[int] = []
+    highs: List[float] = []
+    low_idx: List[int] = []
+    lows: List[float] = []
+    
+    for i in range(lookback, len(candles) - lookback):
+        high = candles[i]["high"]
+        low = candles[i]["low"]
+        
+        is_swing_high = True
+        is_swing_low = True
+        
+        for j in range(i - lookback, i + lookback + 1):
+            if j == i:
+                continue
+            if candles[j]["high"] > high:
+                is_swing_high = False
+            if candles[j]["low"] < low:
+                is_swing_low = False
+        
+        if is_swing_high:
+            high_idx.append(i)
+            highs.append(high)
+        if is_swing_low:
+            low_idx.append(i)
+            lows.append(low)
+    
+    return high_idx, highs, low_idx, lows
+
+
 def _infer_trend(candles: List[Dict], ema_short: int = 8, ema_long: int = 21) -> str:
     """
     Infer trend direction from candle data using EMA crossover and price action.
@@ -371,10 +453,13 @@ def _location_context(
     daily_candles: List[Dict],
     price: float,
     direction: str,
+    atr: Optional[float] = None,
 ) -> Tuple[str, bool]:
     """
     Check if price is at a key location (support/resistance zone).
     
+    If atr is given it is used instead of recomputing _atr(daily_candles, 14).
+    
     Returns:
         Tuple of (note, is_valid_location)
     """
@@ -393,7 +478,8 @@ def _location_context(
     
     swing_highs, swing_lows = _find_pivots(daily_candles[-50:] if len(daily_candles) >= 50 else daily_candles, lookback=3)
     
-    atr = _atr(daily_candles, 14)
+    if atr is None:
+        atr = _atr(daily_candles, 14)
     zone_tolerance = atr * 0.5 if atr > 0 else range_size * 0.05
     
     if direction == "bullish":
@@ -421,20 +507,25 @@ def _fib_context(
     price: float,
     fib_low: float = 0.382,
     fib_high: float = 0.886,
+    daily_pivots: Optional[Tuple[List[float], List[float]]] = None,
 ) -> Tuple[str, bool]:
     """
     Check if price is within a Fibonacci retracement zone.
     
+    daily_pivots, if given, are the lookback=3 pivots of daily_candles
+    (see _find_last_swing_leg_for_fib).
+    
     Returns:
         Tuple of (note, is_in_fib_zone)
     """
     try:
-        candles = daily_candles if daily_candles and len(daily_candles) >= 30 else weekly_candles
+        use_daily = bool(daily_candles) and len(daily_candles) >= 30
+        candles = daily_candles if use_daily else weekly_candles
         
         if not candles or len(candles) < 20:
             return "Fib: Insufficient data", False
         
-        leg = _find_last_swing_leg_for_fib(candles, direction)
+        leg = _find_last_swing_leg_for_fib(candles, direction, daily_pivots if use_daily else None)
         
         if not leg:
             return "Fib: No clear swing leg found", False
@@ -475,20 +566,34 @@ def _fib_context(
         return f"Fib: Error calculating ({type(e).__name__})", False
 
 
-def _find_last_swing_leg_for_fib(candles: List[Dict], direction: str) -> Optional[Tuple[float, float]]:
+def _find_last_swing_leg_for_fib(
+    candles: List[Dict],
+    direction: str,
+    pivots: Optional[Tuple[List[float], List[float]]] = None,
+) -> Optional[Tuple[float, float]]:
     """
     Find the last swing leg for Fibonacci calculation.
     
+    Args:
+        candles: OHLCV candles
+        direction: Trade direction
+        pivots: Precomputed (swing_highs, swing_lows) of candles with
+            lookback=3. Only the last three of each are used, so callers
+            may pass just that tail.
+    
     Returns:
         Tuple of (swing_low, swing_high) or None
     """
     if not candles or len(candles) < 20:
         return None
     
-    try:
-        swing_highs, swing_lows = _find_pivots(candles, lookback=3)
-    except Exception:
-        swing_highs, swing_lows = [], []
+    if pivots is not None:
+        swing_highs, swing_lows = pivots
+    else:
+        try:
+            swing_highs, swing_lows = _find_pivots(candles, lookback=3)
+        except Exception:
+            swing_highs, swing_lows = [], []
     
     if not swing_highs or not swing_lows:
         try:
@@ -514,10 +619,12 @@ def _find_last_swing_leg_for_fib(candles: List[Dict], direction: str) -> Optiona
     return None
 
 
-def _daily_liquidity_context(candles: List[Dict], price: float) -> Tuple[str, bool]:
+def _daily_liquidity_context(candles: List[Dict], price: float, atr: Optional[float] = None) -> Tuple[str, bool]:
     """
     Check for liquidity sweep or proximity to liquidity pools.
     
+    If atr is given it is used instead of recomputing _atr(candles, 14).
+    
     Returns:
         Tuple of (note, is_near_liquidity)
     """
@@ -537,7 +644,8 @@ def _daily_liquidity_context(candles: List[Dict], price: float) -> Tuple[str, bo
         equal_highs = []
         equal_lows = []
         
-        atr = _atr(candles, 14)
+        if atr is None:
+            atr = _atr(candles, 14)
         tolerance = atr * 0.2 if atr > 0 else (max(recent_highs) - min(recent_lows)) * 0.02
         
         for i, h in enumerate(recent_highs):
@@ -730,6 +838,36 @@ def _find_structure_sl(candles: List[Dict], direction: str, lookback: int = 35)
             return max(c["high"] for c in recent[-10:])
 
 
+FLAG_HTF_BIAS = 1 << 0
+FLAG_LOCATION = 1 << 1
+FLAG_FIB = 1 << 2
+FLAG_LIQUIDITY = 1 << 3
+FLAG_STRUCTURE = 1 << 4
+FLAG_CONFIRMATION = 1 << 5
+FLAG_RR = 1 << 6
+
+QUALITY_MASK = FLAG_HTF_BIAS | FLAG_LOCATION | FLAG_FIB | FLAG_LIQUIDITY | FLAG_STRUCTURE
+
+_FLAG_BITS = (
+    ("htf_bias", FLAG_HTF_BIAS),
+    ("location", FLAG_LOCATION),
+    ("fib", FLAG_FIB),
+    ("liquidity", FLAG_LIQUIDITY),
+    ("structure", FLAG_STRUCTURE),
+    ("confirmation", FLAG_CONFIRMATION),
+    ("rr", FLAG_RR),
+)
+
+
+def confluence_mask(flags: Dict[str, bool]) -> int:
+    """Pack a compute_confluence flags dict into a FLAG_* bitmask."""
+    mask = 0
+    for name, bit in _FLAG_BITS:
+        if flags.get(name):
+            mask |= bit
+    return mask
+
+
 def _compute_confluence_flags(
     monthly_candles: List[Dict],
     weekly_candles: List[Dict],
@@ -737,6 +875,9 @@ def _compute_confluence_flags(
     h4_candles: List[Dict],
     direction: str,
     params: Optional[StrategyParams] = None,
+    daily_atr: Optional[float] = None,
+    daily_pivots: Optional[Tuple[List[float], List[float]]] = None,
+    trends: Optional[Tuple[str, str, str]] = None,
 ) -> Tuple[Dict[str, bool], Dict[str, str], Tuple]:
     """
     Compute all confluence flags for a trading setup.
@@ -748,7 +889,8 @@ def _compute_confluence_flags(
         Tuple of (flags dict, notes dict, trade_levels tuple)
     """
     return compute_confluence(
-        monthly_candles, weekly_candles, daily_candles, h4_candles, direction, params
+        monthly_candles, weekly_candles, daily_candles, h4_candles, direction, params,
+        daily_atr=daily_atr, daily_pivots=daily_pivots, trends=trends,
     )
 
 
@@ -759,6 +901,9 @@ def compute_confluence(
     h4_candles: List[Dict],
     direction: str,
     params: Optional[StrategyParams] = None,
+    daily_atr: Optional[float] = None,
+    daily_pivots: Optional[Tuple[List[float], List[float]]] = None,
+    trends: Optional[Tuple[str, str, str]] = None,
 ) -> Tuple[Dict[str, bool], Dict[str, str], Tuple]:
     """
     Compute confluence flags for a given setup.
@@ -772,6 +917,11 @@ def compute_confluence(
         h4_candles: 4H OHLCV data
         direction: Trade direction ("bullish" or "bearish")
         params: Strategy parameters (uses defaults if None)
+        daily_atr: Precomputed _atr(daily_candles, 14), computed here if None
+        daily_pivots: Precomputed lookback=3 (swing_highs, swing_lows) of
+            daily_candles (the last three of each suffice), computed if None
+        trends: Precomputed (monthly, weekly, daily) _infer_trend results,
+            computed here if None
     
     Returns:
         Tuple of (flags dict, notes dict, trade_levels tuple)
@@ -781,25 +931,30 @@ def compute_confluence(
     
     price = daily_candles[-1]["close"] if daily_candles else float("nan")
     
-    mn_trend = _infer_trend(monthly_candles) if monthly_candles else "mixed"
-    wk_trend = _infer_trend(weekly_candles) if weekly_candles else "mixed"
-    d_trend = _infer_trend(daily_candles) if daily_candles else "mixed"
+    if trends is None:
+        mn_trend = _infer_trend(monthly_candles) if monthly_candles else "mixed"
+        wk_trend = _infer_trend(weekly_candles) if weekly_candles else "mixed"
+        d_trend = _infer_trend(daily_candles) if daily_candles else "mixed"
+    else:
+        mn_trend, wk_trend, d_trend = trends
     _, htf_note_text, htf_ok = _pick_direction_from_bias(mn_trend, wk_trend, d_trend)
     
     if params.use_htf_filter:
         loc_note, loc_ok = _location_context(
-            monthly_candles, weekly_candles, daily_candles, price, direction
+            monthly_candles, weekly_candles, daily_candles, price, direction, atr=daily_atr
         )
     else:
         loc_note, loc_ok = "Location filter disabled", True
     
     if params.use_fib_filter:
-        fib_note, fib_ok = _fib_context(weekly_candles, daily_candles, direction, price)
+        fib_note, fib_ok = _fib_context(
+            weekly_candles, daily_candles, direction, price, daily_pivots=daily_pivots
+        )
     else:
         fib_note, fib_ok = "Fib filter disabled", True
     
     if params.use_liquidity_filter:
-        liq_note, liq_ok = _daily_liquidity_context(daily_candles, price)
+        liq_note, liq_ok = _daily_liquidity_context(daily_candles, price, atr=daily_atr)
     else:
         liq_note, liq_ok = "Liquidity filter disabled", True
     
@@ -816,7 +971,7 @@ def compute_confluence(
         conf_note, conf_ok = "Confirmation filter disabled", True
     
     rr_note, rr_ok, entry, sl, tp1, tp2, tp3, tp4, tp5 = compute_trade_levels(
-        daily_candles, direction, params
+        daily_candles, direction, params, atr=daily_atr, pivots=daily_pivots
     )
     
     flags = {
@@ -847,6 +1002,8 @@ def compute_trade_levels(
     daily_candles: List[Dict],
     direction: str,
     params: Optional[StrategyParams] = None,
+    atr: Optional[float] = None,
+    pivots: Optional[Tuple[List[float], List[float]]] = None,
 ) -> Tuple[str, bool, Optional[float], Optional[float], Optional[float], Optional[float], Optional[float], Optional[float], Optional[float]]:
     """
     Compute entry, SL, and TP levels using parameterized logic.
@@ -855,6 +1012,8 @@ def compute_trade_levels(
         daily_candles: Daily OHLCV data
         direction: Trade direction
         params: Strategy parameters
+        atr: Precomputed _atr(daily_candles, 14), computed here if None
+        pivots: Precomputed lookback=3 pivots of daily_candles, computed if None
     
     Returns:
         Tuple of (note, is_valid, entry, sl, tp1, tp2, tp3, tp4, tp5)
@@ -866,12 +1025,13 @@ def compute_trade_levels(
         return "R/R: no data.", False, None, None, None, None, None, None, None
     
     current = daily_candles[-1]["close"]
-    atr = _atr(daily_candles, 14)
+    if atr is None:
+        atr = _atr(daily_candles, 14)
     
     if atr <= 0:
         return "R/R: ATR too small.", False, None, None, None, None, None, None, None
     
-    leg = _find_last_swing_leg_for_fib(daily_candles, direction)
+    leg = _find_last_swing_leg_for_fib(daily_candles, direction, pivots)
     structure_sl = _find_structure_sl(daily_candles, direction, lookback=params.structure_sl_lookback)
     
     if leg:
@@ -10,20 +10,58 @@ This ensures the Discord bot only posts NEW trades and updates,
 not historical ones that were already announced in previous sessions.
 """
 
+import atexit
+import hashlib
 import json
 import os
+import sys
+import tempfile
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Optional, Any
+from typing import Dict, Iterable, List, Set, Tuple, Optional, Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from strategy import ScanResult
-from data import get_ohlcv
+from data import get_ohlcv_batch
 
 
 STATE_FILE = "trade_state.json"
+# Mutations are appended to a log next to STATE_FILE (trade_state.log) and
+# folded into a fresh snapshot once the log grows past this size
+STATE_LOG_COMPACT_BYTES = 64 * 1024
+# Changes are buffered and appended together at most this often (in seconds);
+# flush() writes them out immediately
+STATE_FLUSH_INTERVAL = 1.0
+# The last scan time is only logged this often (in seconds) and at exit,
+# not on every scan
+SCAN_TIME_PERSIST_INTERVAL = 300.0
+# Snapshots are compact JSON; set TRADE_STATE_PRETTY=1 to indent them for debugging
+STATE_PRETTY = bool(os.getenv("TRADE_STATE_PRETTY"))
 
 _active_trades: Dict[str, ScanResult] = {}
 
+# Symbols whose last candle fetch came back empty are not refetched before
+# the monotonic time stored here
+NO_DATA_RETRY_SECONDS = 60.0
+_no_data_until: Dict[str, float] = {}
+
+
+def _dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Encode state as JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
 
 def _key(res: ScanResult) -> str:
     return f"{res.symbol}:{res.direction}"
@@ -56,11 +94,24 @@ def evaluate_trades_for_updates() -> List[Tuple[ScanResult, str, float, float]]:
     """
     events: List[Tuple[ScanResult, str, float, float]] = []
 
-    for trade in _active_trades.values():
-        if getattr(trade, "is_closed", False):
-            continue
+    open_trades = [t for t in _active_trades.values() if not t.is_closed]
+    now = time.monotonic()
+    # One fetch per symbol, even when both directions are tracked
+    candles_by_symbol = get_ohlcv_batch(
+        [t.symbol for t in open_trades if _no_data_until.get(t.symbol, 0.0) <= now],
+        timeframe="H4",
+        count=1,
+    )
+    for symbol, candles in candles_by_symbol.items():
+        if candles:
+            _no_data_until.pop(symbol, None)
+        else:
+            if symbol not in _no_data_until:
+                print(f"[TradeState] No H4 data for {symbol}, retrying in {NO_DATA_RETRY_SECONDS:.0f}s")
+            _no_data_until[symbol] = now + NO_DATA_RETRY_SECONDS
 
-        candles = get_ohlcv(trade.symbol, timeframe="H4", count=1)
+    for trade in open_trades:
+        candles = candles_by_symbol.get(trade.symbol)
         if not candles:
             continue
 
@@ -83,7 +134,7 @@ def evaluate_trades_for_updates() -> List[Tuple[ScanResult, str, float, float]]:
             risk = None
 
         if trade.direction == "bullish":
-            if not getattr(trade, "sl_hit", False) and low <= sl:
+            if not trade.sl_hit and low <= sl:
                 trade.sl_hit = True
                 trade.is_closed = True
                 trade.status = "closed - SL hit"
@@ -91,17 +142,17 @@ def evaluate_trades_for_updates() -> List[Tuple[ScanResult, str, float, float]]:
                 events.append((trade, "SL", sl, rr))
                 continue
 
-            if trade.tp1 is not None and (not getattr(trade, "tp1_hit", False)) and high >= trade.tp1:
+            if trade.tp1 is not None and not trade.tp1_hit and high >= trade.tp1:
                 trade.tp1_hit = True
                 rr = ((trade.tp1 - entry) / risk) if risk else float("nan")
                 events.append((trade, "TP1", trade.tp1, rr))
 
-            if trade.tp2 is not None and (not getattr(trade, "tp2_hit", False)) and high >= trade.tp2:
+            if trade.tp2 is not None and not trade.tp2_hit and high >= trade.tp2:
                 trade.tp2_hit = True
                 rr = ((trade.tp2 - entry) / risk) if risk else float("nan")
                 events.append((trade, "TP2", trade.tp2, rr))
 
-            if trade.tp3 is not None and (not getattr(trade, "tp3_hit", False)) and high >= trade.tp3:
+            if trade.tp3 is not None and not trade.tp3_hit and high >= trade.tp3:
                 trade.tp3_hit = True
                 trade.is_closed = True
                 trade.status = "closed - TP3 hit"
@@ -109,7 +160,7 @@ def evaluate_trades_for_updates() -> List[Tuple[ScanResult, str, float, float]]:
                 events.append((trade, "TP3", trade.tp3, rr))
 
         else:
-            if not getattr(trade, "sl_hit", False) and high >= sl:
+            if not trade.sl_hit and high >= sl:
                 trade.sl_hit = True
                 trade.is_closed = True
                 trade.status = "closed - SL hit"
@@ -117,17 +168,17 @@ def evaluate_trades_for_updates() -> List[Tuple[ScanResult, str, float, float]]:
                 events.append((trade, "SL", sl, rr))
                 continue
 
-            if trade.tp1 is not None and (not getattr(trade, "tp1_hit", False)) and low <= trade.tp1:
+            if trade.tp1 is not None and not trade.tp1_hit and low <= trade.tp1:
                 trade.tp1_hit = True
                 rr = ((entry - trade.tp1) / risk) if risk else float("nan")
                 events.append((trade, "TP1", trade.tp1, rr))
 
-            if trade.tp2 is not None and (not getattr(trade, "tp2_hit", False)) and low <= trade.tp2:
+            if trade.tp2 is not None and not trade.tp2_hit and low <= trade.tp2:
                 trade.tp2_hit = True
                 rr = ((entry - trade.tp2) / risk) if risk else float("nan")
                 events.append((trade, "TP2", trade.tp2, rr))
 
-            if trade.tp3 is not None and (not getattr(trade, "tp3_hit", False)) and low <= trade.tp3:
+            if trade.tp3 is not None and not trade.tp3_hit and low <= trade.tp3:
                 trade.tp3_hit = True
                 trade.is_closed = True
                 trade.status = "closed - TP3 hit"
@@ -143,36 +194,61 @@ class TradeStateManager:
     
     Tracks:
     - posted_trades: Set of trade IDs that have been announced
-    - posted_updates: Dict mapping trade_id -> list of update types already posted
+    - posted_updates: Set of (trade_id, update_type) pairs already posted
     - bot_startup_time: When the current bot session started
     - last_scan_time: When the last scan was completed
+    
+    The state file is a snapshot; each change after it is appended to a log
+    (one JSON record per line) that is replayed on load and compacted into
+    a new snapshot when it gets large.
     """
     
-    def __init__(self, state_file: str = STATE_FILE):
+    def __init__(self, state_file: str = STATE_FILE, verbose: bool = False):
         self.state_file = Path(state_file)
+        # Print every posted trade/update as it is marked (load, clear and
+        # error messages are always printed)
+        self.verbose = verbose
+        self.log_file = self.state_file.with_suffix(".log")
+        self._log_size = 0
+        self._pending: List[bytes] = []
+        self._last_flush = 0.0
+        self._log_fd: Optional[int] = None  # opened on first write, kept open
+        self._snapshot_digest: Optional[bytes] = None
         self.posted_trades: Set[str] = set()
-        self.posted_updates: Dict[str, Set[str]] = {}
+        self.posted_updates: Set[Tuple[str, str]] = set()
         self.bot_startup_time: Optional[datetime] = None
-        self.last_scan_time: Optional[datetime] = None
+        self._startup_monotonic = 0.0
+        # Epoch seconds; last_scan_time converts to a datetime on demand
+        self._last_scan_ts: Optional[float] = None
+        self._scan_ts_persisted: Optional[float] = None
         self._load_state()
+        atexit.register(self.close)
     
     def _load_state(self) -> None:
         """Load state from persistent file."""
         if self.state_file.exists():
             try:
-                with open(self.state_file, "r") as f:
-                    data = json.load(f)
+                with open(self.state_file, "rb") as f:
+                    data = _loads(f.read())
                 
-                self.posted_trades = set(data.get("posted_trades", []))
+                # IDs are interned so lookups with IDs from generate_trade_id
+                # usually match on identity
+                self.posted_trades = set(map(sys.intern, data.get("posted_trades", [])))
                 
-                updates_raw = data.get("posted_updates", {})
-                self.posted_updates = {k: set(v) for k, v in updates_raw.items()}
+                updates_raw = data.get("posted_updates", [])
+                if isinstance(updates_raw, dict):
+                    # Older snapshots map trade_id -> list of update types
+                    self.posted_updates = {
+                        (sys.intern(k), sys.intern(u)) for k, v in updates_raw.items() for u in v
+                    }
+                else:
+                    self.posted_updates = {(sys.intern(k), sys.intern(u)) for k, u in updates_raw}
                 
                 if data.get("last_scan_time"):
-                    self.last_scan_time = datetime.fromisoformat(data["last_scan_time"])
+                    self._last_scan_ts = datetime.fromisoformat(data["last_scan_time"]).timestamp()
                 
                 print(f"[TradeState] Loaded state: {len(self.posted_trades)} posted trades, "
-                      f"{sum(len(v) for v in self.posted_updates.values())} posted updates")
+                      f"{len(self.posted_updates)} posted updates")
             except Exception as e:
                 print(f"[TradeState] Error loading state: {e}")
                 self._reset_state()
@@ -180,28 +256,144 @@ class TradeStateManager:
             print("[TradeState] No existing state file, starting fresh")
             self._reset_state()
         
+        self._replay_log()
         self.bot_startup_time = datetime.now(timezone.utc)
+        self._startup_monotonic = time.monotonic()
+        self._scan_ts_persisted = self._last_scan_ts
     
     def _reset_state(self) -> None:
         """Reset to clean state."""
         self.posted_trades = set()
-        self.posted_updates = {}
-        self.last_scan_time = None
+        self.posted_updates = set()
+        self._last_scan_ts = None
+    
+    def _replay_log(self) -> None:
+        """Apply changes logged since the snapshot was written."""
+        if not self.log_file.exists():
+            return
+        
+        applied = 0
+        torn = False
+        try:
+            with open(self.log_file, "rb") as f:
+                for line in f:
+                    try:
+                        record = _loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-append
+                        torn = True
+                        continue
+                    self._apply(record)
+                    applied += 1
+            self._log_size = self.log_file.stat().st_size
+        except Exception as e:
+            print(f"[TradeState] Error replaying state log: {e}")
+            return
+        
+        if applied:
+            print(f"[TradeState] Replayed {applied} logged changes")
+        if torn:
+            # Start a clean log so the next append is not glued onto the torn line
+            self._compact()
+    
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """Apply one logged change to the in-memory state."""
+        op = record.get("op")
+        if op == "post":
+            self.posted_trades.add(sys.intern(record["id"]))
+        elif op == "update":
+            self.posted_updates.add((sys.intern(record["id"]), sys.intern(record["type"])))
+        elif op == "remove":
+            self._discard_trade(record["id"])
+        elif op == "scan":
+            self._last_scan_ts = record["ts"]
     
-    def _save_state(self) -> None:
-        """Save state to persistent file."""
+    def _append_log(self, record: Dict[str, Any]) -> None:
+        """Queue one change for the log, flushing if the last flush was a while ago."""
+        self._queue_log(record)
+        if time.monotonic() - self._last_flush >= STATE_FLUSH_INTERVAL:
+            self.flush()
+    
+    def _queue_log(self, record: Dict[str, Any]) -> None:
+        """Queue one change for the next flush."""
+        self._pending.append(_dumps(record) + b"\n")
+    
+    def flush(self) -> None:
+        """Append all queued changes to the log in one write."""
+        if not self._pending:
+            return
+        chunk = b"".join(self._pending)
+        self._pending.clear()
+        self._last_flush = time.monotonic()
+        try:
+            fd = self._open_log()
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(fd, view):]
+            self._log_size += len(chunk)
+        except Exception as e:
+            print(f"[TradeState] Error writing state log: {e}")
+            return
+        
+        if self._log_size > STATE_LOG_COMPACT_BYTES:
+            self._compact()
+    
+    def _compact(self) -> None:
+        """Write a fresh snapshot and empty the log it now includes."""
+        if not self._save_state():
+            return
+        self._scan_ts_persisted = self._last_scan_ts
+        try:
+            os.ftruncate(self._open_log(), 0)
+            self._log_size = 0
+        except Exception as e:
+            print(f"[TradeState] Error truncating state log: {e}")
+    
+    def _open_log(self) -> int:
+        """Get the log's append-mode file descriptor, opening it on first use."""
+        if self._log_fd is None:
+            self._log_fd = os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        return self._log_fd
+    
+    def close(self) -> None:
+        """Flush queued changes (including the latest scan time) and close the log."""
+        if self._last_scan_ts != self._scan_ts_persisted:
+            self._queue_log({"op": "scan", "ts": self._last_scan_ts})
+            self._scan_ts_persisted = self._last_scan_ts
+        self.flush()
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            self._log_fd = None
+    
+    def _save_state(self) -> bool:
+        """Atomically write a full snapshot of the state. Returns True on success."""
         try:
             data = {
                 "posted_trades": list(self.posted_trades),
-                "posted_updates": {k: list(v) for k, v in self.posted_updates.items()},
+                "posted_updates": list(self.posted_updates),
                 "last_scan_time": self.last_scan_time.isoformat() if self.last_scan_time else None,
-                "last_updated": datetime.now(timezone.utc).isoformat(),
             }
+            # Nothing to write if the state matches the last snapshot we wrote
+            digest = hashlib.blake2b(_dumps(data), digest_size=16).digest()
+            if digest == self._snapshot_digest and self.state_file.exists():
+                return True
+            data["last_updated"] = datetime.now(timezone.utc).isoformat()
             
-            with open(self.state_file, "w") as f:
-                json.dump(data, f, indent=2)
+            # Write beside the target and rename over it, so a crash mid-write
+            # never leaves a truncated snapshot
+            fd, tmp_path = tempfile.mkstemp(dir=self.state_file.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(_dumps(data, pretty=STATE_PRETTY))
+                os.replace(tmp_path, self.state_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._snapshot_digest = digest
+            return True
         except Exception as e:
             print(f"[TradeState] Error saving state: {e}")
+            return False
     
     def generate_trade_id(self, symbol: str, direction: str, entry: Optional[float] = None) -> str:
         """
@@ -217,9 +409,9 @@ class TradeStateManager:
                 entry_key = f"{entry:.3f}"
             else:
                 entry_key = f"{entry:.5f}"
-            return f"{symbol}_{direction}_{entry_key}"
+            return sys.intern(f"{symbol}_{direction}_{entry_key}")
         else:
-            return f"{symbol}_{direction}"
+            return sys.intern(f"{symbol}_{direction}")
     
     def is_trade_posted(self, trade_id: str) -> bool:
         """Check if a trade has already been posted to Discord."""
@@ -227,9 +419,19 @@ class TradeStateManager:
     
     def mark_trade_posted(self, trade_id: str) -> None:
         """Mark a trade as posted to Discord."""
-        self.posted_trades.add(trade_id)
-        self._save_state()
-        print(f"[TradeState] Marked trade as posted: {trade_id}")
+        self.posted_trades.add(sys.intern(trade_id))
+        self._append_log({"op": "post", "id": trade_id})
+        if self.verbose:
+            print(f"[TradeState] Marked trade as posted: {trade_id}")
+    
+    def mark_trades_posted(self, trade_ids: Iterable[str]) -> None:
+        """Mark several trades as posted, writing them to the log together."""
+        for trade_id in trade_ids:
+            self.posted_trades.add(sys.intern(trade_id))
+            self._queue_log({"op": "post", "id": trade_id})
+            if self.verbose:
+                print(f"[TradeState] Marked trade as posted: {trade_id}")
+        self.flush()
     
     def is_update_posted(self, trade_id: str, update_type: str) -> bool:
         """
@@ -237,34 +439,69 @@ class TradeStateManager:
         
         update_type: "tp1", "tp2", "tp3", "sl", "closed", etc.
         """
-        if trade_id not in self.posted_updates:
-            return False
-        return update_type in self.posted_updates[trade_id]
+        return (trade_id, update_type) in self.posted_updates
     
     def mark_update_posted(self, trade_id: str, update_type: str) -> None:
         """Mark a specific update as posted."""
-        if trade_id not in self.posted_updates:
-            self.posted_updates[trade_id] = set()
-        self.posted_updates[trade_id].add(update_type)
-        self._save_state()
-        print(f"[TradeState] Marked update as posted: {trade_id} -> {update_type}")
+        self.posted_updates.add((trade_id, update_type))
+        self._append_log({"op": "update", "id": trade_id, "type": update_type})
+        if self.verbose:
+            print(f"[TradeState] Marked update as posted: {trade_id} -> {update_type}")
+    
+    def mark_updates_posted(self, updates: Iterable[Tuple[str, str]]) -> None:
+        """Mark several (trade_id, update_type) updates as posted, writing them to the log together."""
+        for trade_id, update_type in updates:
+            self.posted_updates.add((trade_id, update_type))
+            self._queue_log({"op": "update", "id": trade_id, "type": update_type})
+            if self.verbose:
+                print(f"[TradeState] Marked update as posted: {trade_id} -> {update_type}")
+        self.flush()
+    
+    def check_and_mark_update(self, trade_id: str, update_type: str) -> bool:
+        """
+        Mark an update as posted unless it already was.
+        
+        Returns True if the caller should post it (it was not posted before).
+        """
+        key = (trade_id, update_type)
+        if key in self.posted_updates:
+            return False
+        self.posted_updates.add(key)
+        self._append_log({"op": "update", "id": trade_id, "type": update_type})
+        if self.verbose:
+            print(f"[TradeState] Marked update as posted: {trade_id} -> {update_type}")
+        return True
     
     def remove_trade(self, trade_id: str) -> None:
         """Remove a trade from tracking (when fully closed)."""
+        self._discard_trade(trade_id)
+        self._append_log({"op": "remove", "id": trade_id})
+    
+    def _discard_trade(self, trade_id: str) -> None:
+        """Drop a trade and all of its posted updates from memory."""
         self.posted_trades.discard(trade_id)
-        self.posted_updates.pop(trade_id, None)
-        self._save_state()
+        self.posted_updates = {p for p in self.posted_updates if p[0] != trade_id}
     
     def update_scan_time(self) -> None:
         """Record the current time as the last scan time."""
-        self.last_scan_time = datetime.now(timezone.utc)
-        self._save_state()
+        self._last_scan_ts = time.time()
+        persisted = self._scan_ts_persisted
+        if persisted is None or self._last_scan_ts - persisted >= SCAN_TIME_PERSIST_INTERVAL:
+            self._append_log({"op": "scan", "ts": self._last_scan_ts})
+            self._scan_ts_persisted = self._last_scan_ts
+    
+    @property
+    def last_scan_time(self) -> Optional[datetime]:
+        """When the last scan was completed (UTC)."""
+        if self._last_scan_ts is None:
+            return None
+        return datetime.fromtimestamp(self._last_scan_ts, timezone.utc)
     
     def get_seconds_since_startup(self) -> float:
         """Get seconds elapsed since bot startup."""
         if not self.bot_startup_time:
             return 0.0
-        return (datetime.now(timezone.utc) - self.bot_startup_time).total_seconds()
+        return time.monotonic() - self._startup_monotonic
     
     def should_post_new_trade(self, trade_id: str, signal_time: Optional[datetime] = None) -> bool:
         """
@@ -288,7 +525,7 @@ class TradeStateManager:
         """Get a summary of current state for debugging."""
         return {
             "posted_trades_count": len(self.posted_trades),
-            "posted_updates_count": sum(len(v) for v in self.posted_updates.values()),
+            "posted_updates_count": len(self.posted_updates),
             "bot_startup_time": self.bot_startup_time.isoformat() if self.bot_startup_time else None,
             "last_scan_time": self.last_scan_time.isoformat() if self.last_scan_time else None,
             "seconds_since_startup": self.get_seconds_since_startup(),
@@ -297,13 +534,18 @@ class TradeStateManager:
     def clear_state(self) -> None:
         """Clear all state (for testing/reset)."""
         self._reset_state()
-        self._save_state()
+        self._pending.clear()
+        self._compact()
         print("[TradeState] State cleared")
 
 
-TRADE_STATE = TradeStateManager()
+# Created on first use, so importing this module does no disk I/O
+_TRADE_STATE: Optional[TradeStateManager] = None
 
 
 def get_trade_state() -> TradeStateManager:
     """Get the global trade state manager instance."""
-    return TRADE_STATE
+    global _TRADE_STATE
+    if _TRADE_STATE is None:
+        _TRADE_STATE = TradeStateManager()
+    return _TRADE_STATE